@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Several cameras feeding one OCR monitor.
+# Each camera is a frame source (the SLAM pipe, another pipe, or a frame
+# broker subscription) plus its extrinsic: the 4x4 transform from that
+# camera's frame into the SLAM camera's frame. One select() loop drains every
+# source to its latest frame; OCR is then given to the camera that has had
+# the least OCR time so far (cameras whose latest frame the sign classifier
+# flagged first), and nobody gets it while OCR as a whole is over its share
+# of wall-clock time.
+import logging
+import select
+import time
+from collections import deque
+import numpy as np
+from frame_broker import PipeReader, FrameSubscriber
+from ocr_scheduler import parse_pose
+
+BUDGET_WINDOW = 10.0  # seconds over which the OCR CPU budget is measured
+
+MAX_DRAIN = 32  # frames read from one source per poll, so a fast source can't starve the loop
+
+def format_pose(T):
+    """4x4 matrix in the pose file's layout: one whitespace-separated row per line"""
+    return "\n".join(" ".join(f"{v:.6f}" for v in row) for row in T)
+
+def camera_pose(pose_text, extrinsic):
+    """SLAM pose text (camera-from-world) re-expressed for a camera mounted at `extrinsic`.
+
+    extrinsic maps points in this camera's frame into the SLAM camera's frame,
+    so camera-from-world = inv(extrinsic) @ slam-from-world. Returns the text
+    unchanged for the SLAM camera itself, and "unknown" when the SLAM pose
+    can't be parsed (it would be the wrong camera's pose).
+    """
+    if extrinsic is None:
+        return pose_text
+    pose = parse_pose(pose_text)
+    if pose is None:
+        logging.warning(f"Unparseable SLAM pose {pose_text!r}; logging the extra camera's pose as unknown")
+        return "unknown"
+    slam_from_world = np.eye(4)
+    slam_from_world[:3, :3], slam_from_world[:3, 3] = pose
+    return format_pose(np.linalg.inv(extrinsic) @ slam_from_world)
+
+class Camera:
+    def __init__(self, camera_id, source, extrinsic=None):
+        self.id = camera_id
+        self.source = source
+        self.extrinsic = None if extrinsic is None else np.asarray(extrinsic, dtype=float).reshape(4, 4)
+        self.latest = None       # newest frame not yet given to OCR
+        self.latest_times = (None, None)  # its capture and pipe read times, for tracing
+        self.gray = None         # grey copy of latest, set when the sign classifier scored it
+        self.sign = False        # the classifier saw a sign in latest
+        self.sign_regions = None  # where, in frame pixels (None: the whole frame)
+        self.frames = 0
+        self.ocr_frames = 0
+        self.ocr_seconds = 0.0
+        self.clips = None
+
+    def fileno(self):
+        return self.source.fileno()
+
+    def pose(self, pose_text):
+        return camera_pose(pose_text, self.extrinsic)
+
+def open_source(config):
+    """A frame source from a camera config: {"pipe": path} or {"broker": socket path}"""
+    if config.get("broker"):
+        return FrameSubscriber(config["broker"], f"ocr_monitor-{config['id']}", "latest")
+    return PipeReader(config["pipe"])
+
+class CameraSet:
+    """Multiplexes the cameras and shares OCR between them"""
+
+    def __init__(self, cameras, cpu_budget=1.0):
+        self.cameras = cameras
+        self.cpu_budget = cpu_budget
+        self.busy = deque()  # (end time, OCR seconds)
+        self.over_budget = 0
+
+    def __len__(self):
+        return len(self.cameras)
+
+    def readable(self, timeout):
+        readable, _, _ = select.select(self.cameras, [], [], max(0.0, timeout))
+        return readable
+
+    def poll(self, timeout):
+        """(camera, frame) for every frame read; each readable source is read until it has
+        nothing waiting (up to MAX_DRAIN frames), so camera.latest is its newest frame"""
+        fresh = []
+        for camera in self.readable(timeout):
+            for frame in self.read_latest(camera):
+                camera.latest = frame
+                camera.latest_times = (camera.source.last_capture, camera.source.last_time)
+                camera.gray, camera.sign, camera.sign_regions = None, False, None
+                camera.frames += 1
+                fresh.append((camera, frame))
+        return fresh
+
+    def read_latest(self, camera):
+        """Frames waiting on one readable camera's source, oldest first"""
+        for _ in range(MAX_DRAIN):
+            frame = camera.source.read()
+            if frame is None:
+                return
+            yield frame
+            ready, _, _ = select.select([camera], [], [], 0)
+            if not ready:
+                return
+
+    def busy_fraction(self, now):
+        while self.busy and self.busy[0][0] < now - BUDGET_WINDOW:
+            self.busy.popleft()
+        return sum(seconds for _, seconds in self.busy) / BUDGET_WINDOW
+
+    def pick(self, now=None):
+        """The camera whose latest frame gets OCR next (least OCR time so far, flagged signs first), or None"""
+        now = time.time() if now is None else now
+        waiting = [camera for camera in self.cameras if camera.latest is not None]
+        if not waiting:
+            return None
+        if self.busy_fraction(now) >= self.cpu_budget:
+            self.over_budget += 1
+            return None
+        flagged = [camera for camera in waiting if camera.sign]
+        return min(flagged or waiting, key=lambda camera: camera.ocr_seconds)
+
+    def take(self, camera):
+        frame, camera.latest = camera.latest, None
+        camera.gray, camera.sign, camera.sign_regions = None, False, None
+        return frame
+
+    def charge(self, camera, seconds, now=None):
+        now = time.time() if now is None else now
+        camera.ocr_frames += 1
+        camera.ocr_seconds += seconds
+        self.busy.append((now, seconds))
+
+    def close(self):
+        for camera in self.cameras:
+            camera.source.close()
+
+    def stats(self):
+        parts = [f"{c.id} {c.ocr_frames}/{c.frames} frames, {c.ocr_seconds:.0f}s OCR" for c in self.cameras]
+        return (f"Cameras: {' | '.join(parts)} | OCR load {100 * self.busy_fraction(time.time()):.0f}% "
+                f"(budget {100 * self.cpu_budget:.0f}%, {self.over_budget} frames over)")
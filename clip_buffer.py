@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Rolling buffer of recent frames for debugging misreads.
+# Frames are kept JPEG-compressed in a ring capped by bytes, not frame count,
+# so memory stays fixed whatever the resolution. When a keyword fires, the
+# frames from a few seconds before to a few seconds after are handed to a
+# background thread that writes them out as one clip; nothing touches the
+# disk otherwise.
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+class ClipBuffer:
+    def __init__(self, out_dir, max_bytes=32 * 1024 * 1024, pre_seconds=3.0, post_seconds=3.0,
+                 fps=10.0, jpeg_quality=80):
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.min_interval = 1.0 / fps
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.ring = deque()  # (timestamp, jpeg bytes)
+        self.ring_bytes = 0
+        self.last_push = 0.0
+        self.active = None   # (clip name, end time, frames) while collecting post-trigger frames
+        self.clips_written = 0
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="clip-writer", daemon=True)
+        self.writer.start()
+
+    def push(self, frame, now=None):
+        now = time.time() if now is None else now
+        if now - self.last_push < self.min_interval:
+            return
+        self.last_push = now
+        ok, jpeg = cv2.imencode(".jpg", frame, self.encode_params)
+        if not ok:
+            return
+        item = (now, jpeg.tobytes())
+        self.ring.append(item)
+        self.ring_bytes += len(item[1])
+        while self.ring_bytes > self.max_bytes and len(self.ring) > 1:
+            self.ring_bytes -= len(self.ring.popleft()[1])
+        if self.active is not None:
+            name, end, frames = self.active
+            frames.append(item)
+            # repeated triggers extend a clip, but never past the ring's own budget
+            if now >= end or sum(len(jpeg) for _, jpeg in frames) > self.max_bytes:
+                self.finish()
+
+    def trigger(self, name, now=None):
+        """Start a clip around now; a trigger while one is being collected just extends it"""
+        now = time.time() if now is None else now
+        if self.active is not None:
+            active_name, _, frames = self.active
+            self.active = (active_name, now + self.post_seconds, frames)
+            return
+        frames = [item for item in self.ring if item[0] >= now - self.pre_seconds]
+        self.active = (name, now + self.post_seconds, frames)
+
+    def finish(self):
+        if self.active is not None:
+            name, _, frames = self.active
+            self.writes.put((name, frames))
+            self.active = None
+
+    def write_loop(self):
+        while True:
+            job = self.writes.get()
+            if job is None:
+                return
+            name, frames = job
+            try:
+                self.write_clip(name, frames)
+            except Exception as e:
+                logging.error(f"Clip {name} failed: {e}")
+
+    def write_clip(self, name, frames):
+        if not frames:
+            return
+        times = [t for t, _ in frames]
+        fps = (len(frames) - 1) / (times[-1] - times[0]) if len(frames) > 1 and times[-1] > times[0] else 1.0
+        first = cv2.imdecode(np.frombuffer(frames[0][1], np.uint8), cv2.IMREAD_COLOR)
+        path = os.path.join(self.out_dir, f"{name}.avi")
+        # decoded here rather than in push() so the capture loop only ever pays for the encode
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (first.shape[1], first.shape[0]))
+        try:
+            for _, jpeg in frames:
+                writer.write(cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR))
+        finally:
+            writer.release()
+        self.clips_written += 1
+        logging.info(f"Saved clip to: {path} ({len(frames)} frames)")
+
+    def close(self):
+        """Write any clip still collecting and wait for the writer"""
+        self.finish()
+        self.writes.put(None)
+        self.writer.join()
+
+    def stats(self):
+        span = self.ring[-1][0] - self.ring[0][0] if len(self.ring) > 1 else 0.0
+        return (f"Clip buffer: {len(self.ring)} frames ({self.ring_bytes / 1e6:.1f} MB, {span:.1f} s) | "
+                f"{self.clips_written} clips written")
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import torch
+import easyocr
+from onnxruntime.quantization import quantize_dynamic, QuantType
+
+# Exports EasyOCR's English CRAFT detector and CRNN recognizer to ONNX with
+# dynamic int8 weight quantization, for the "onnx" backend in ocr_monitor.py.
+# Run once on any machine with torch + easyocr; copy the output dir to the Pi.
+
+DETECTOR_FILE = "craft_int8.onnx"
+RECOGNIZER_FILE = "recognizer_int8.onnx"
+CHARSET_FILE = "charset.json"
+OPSET = 17
+
+class DetectorWrapper(torch.nn.Module):
+    # CRAFT returns (score maps, feature); only the score maps are needed
+    def __init__(self, net):
+        super().__init__()
+        self.net = net
+
+    def forward(self, x):
+        return self.net(x)[0]
+
+class RecognizerWrapper(torch.nn.Module):
+    # Same as easyocr.model.vgg_model.Model.forward, with the AdaptiveAvgPool
+    # over height written as a mean so the width axis stays dynamic in ONNX
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x):
+        visual_feature = self.model.FeatureExtraction(x)
+        visual_feature = visual_feature.permute(0, 3, 1, 2).mean(dim=3)
+        contextual_feature = self.model.SequenceModeling(visual_feature)
+        return self.model.Prediction(contextual_feature.contiguous())
+
+def export_detector(net, path):
+    print("📦 Exporting CRAFT detector...")
+    dummy = torch.randn(1, 3, 480, 640)
+    torch.onnx.export(DetectorWrapper(net).eval(), dummy, path, opset_version=OPSET,
+                      input_names=["image"], output_names=["score_maps"],
+                      dynamic_axes={"image": {2: "height", 3: "width"},
+                                    "score_maps": {1: "map_height", 2: "map_width"}},
+                      dynamo=False)
+
+def export_recognizer(model, path):
+    print("📦 Exporting CRNN recognizer...")
+    dummy = torch.randn(2, 1, 64, 256)
+    torch.onnx.export(RecognizerWrapper(model).eval(), dummy, path, opset_version=OPSET,
+                      input_names=["crops"], output_names=["logits"],
+                      dynamic_axes={"crops": {0: "batch", 3: "width"},
+                                    "logits": {0: "batch", 1: "steps"}},
+                      dynamo=False)
+
+def quantize(fp32_path, int8_path):
+    # uint8 weights: ONNX Runtime's CPU ConvInteger kernel only takes uint8
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+    fp32_mb = os.path.getsize(fp32_path) / 1e6
+    int8_mb = os.path.getsize(int8_path) / 1e6
+    print(f"🗜️ {os.path.basename(int8_path)}: {fp32_mb:.1f} MB -> {int8_mb:.1f} MB")
+
+def main(out_dir, keep_fp32):
+    os.makedirs(out_dir, exist_ok=True)
+    # quantize=False: torch's own dynamic quantization can't be exported
+    reader = easyocr.Reader(['en'], gpu=False, quantize=False)
+
+    exports = [
+        (export_detector, reader.detector, DETECTOR_FILE),
+        (export_recognizer, reader.recognizer, RECOGNIZER_FILE),
+    ]
+    with torch.no_grad():
+        for export, model, name in exports:
+            fp32_path = os.path.join(out_dir, name.replace("_int8", "_fp32"))
+            export(model, fp32_path)
+            quantize(fp32_path, os.path.join(out_dir, name))
+            if not keep_fp32:
+                os.remove(fp32_path)
+
+    with open(os.path.join(out_dir, CHARSET_FILE), "w") as f:
+        json.dump({"character": reader.character, "lang_char": reader.lang_char}, f)
+    print(f"✅ ONNX models written to: {out_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export EasyOCR models to quantized ONNX.")
+    parser.add_argument("--out", default=os.path.expanduser("~/dev/ORB_SLAM3/Models/easyocr_onnx"),
+                        help="Output directory")
+    parser.add_argument("--keep-fp32", action="store_true", help="Keep the unquantized .onnx files")
+    args = parser.parse_args()
+
+    main(args.out, args.keep_fp32)
@@ -0,0 +1,170 @@
+import argparse
+import os
+import re
+import sys
+import cv2
+import numpy as np
+
+# Trains the HOG + logistic regression "sign present" gate used by ocr_monitor.py
+# from its own logs: windows over the keyword boxes in ocr_*.jpg snapshots are
+# positives, windows away from them (and from --negatives frames) are negatives.
+# The threshold is set on held-out snapshots to keep --target-recall of sign windows.
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sign_classifier import WINDOW, CELL, WINDOW_STRIDE, PYRAMID, FEATURE_SIZE, window_features  # noqa: E402
+
+POSITIVE_OVERLAP = 0.5       # window area that must lie on a keyword box
+TEXT_HEIGHT_RANGE = (0.25, 1.5)  # keyword box height / window height for a positive at that scale
+LABEL_BAND = 30              # px above a box where the monitor printed its label; never a negative
+MAX_NEGATIVES_PER_IMAGE = 200
+
+def parse_detection_logs(log_dir):
+    """{snapshot name: [bbox, ...]} from ocr_detections_*.txt"""
+    boxes = {}
+    for name in sorted(os.listdir(log_dir)):
+        if not (name.startswith("ocr_detections_") and name.endswith(".txt")):
+            continue
+        pending = []
+        with open(os.path.join(log_dir, name)) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("== "):
+                    pending = []
+                elif line.startswith("BBox:"):
+                    # boxes may be printed as np.int32(...) values
+                    numbers = re.findall(r"-?\d+(?:\.\d+)?", re.sub(r"np\.\w+\(", "(", line[5:]))
+                    if len(numbers) == 8:
+                        pending.append(np.array(numbers, dtype=float).reshape(4, 2))
+                elif line.startswith("Saved Image:"):
+                    # repeated after each keyword of a block; the last one carries all its boxes
+                    boxes[line.split(":", 1)[1].strip()] = list(pending)
+    return boxes
+
+def remove_annotations(frame):
+    """Inpaint the green boxes and labels the monitor drew on its snapshots"""
+    b, g, r = cv2.split(frame)
+    mask = ((g > 180) & (r < 100) & (b < 100)).astype(np.uint8) * 255
+    mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+    return cv2.inpaint(frame, mask, 3, cv2.INPAINT_TELEA)
+
+def window_grid(features, scale):
+    """Frame-pixel (x0, y0, x1, y1) of every window in a window_features() grid"""
+    rows, cols = features.shape[:2]
+    ys, xs = np.mgrid[0:rows, 0:cols]
+    x0 = xs * WINDOW_STRIDE[0] * CELL / scale
+    y0 = ys * WINDOW_STRIDE[1] * CELL / scale
+    return np.stack([x0, y0, x0 + WINDOW[0] / scale, y0 + WINDOW[1] / scale], axis=-1).reshape(-1, 4)
+
+def overlap(windows, rect):
+    w = np.clip(np.minimum(windows[:, 2], rect[2]) - np.maximum(windows[:, 0], rect[0]), 0, None)
+    h = np.clip(np.minimum(windows[:, 3], rect[3]) - np.maximum(windows[:, 1], rect[1]), 0, None)
+    return w * h
+
+def image_samples(grey, boxes, rng):
+    """(positive features, negative features) from every pyramid level of one frame"""
+    positives, negatives = [], []
+    rects = [(b[:, 0].min(), b[:, 1].min(), b[:, 0].max(), b[:, 1].max()) for b in boxes]
+    for scale in PYRAMID:
+        small = cv2.resize(grey, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        features = window_features(small)
+        if features.size == 0:
+            continue
+        windows = window_grid(features, scale)
+        features = features.reshape(-1, FEATURE_SIZE)
+        area = (windows[:, 2] - windows[:, 0]) * (windows[:, 3] - windows[:, 1])
+        positive = np.zeros(len(windows), bool)
+        touched = np.zeros(len(windows), bool)
+        for x0, y0, x1, y1 in rects:
+            ratio = (y1 - y0) * scale / WINDOW[1]
+            on_box = overlap(windows, (x0, y0, x1, y1))
+            touched |= overlap(windows, (x0, y0 - LABEL_BAND, x1, y1)) > 0
+            if TEXT_HEIGHT_RANGE[0] <= ratio <= TEXT_HEIGHT_RANGE[1]:
+                positive |= on_box >= POSITIVE_OVERLAP * area
+        positives.append(features[positive])
+        negative = np.flatnonzero(~touched)
+        if len(negative) > MAX_NEGATIVES_PER_IMAGE:
+            negative = rng.choice(negative, MAX_NEGATIVES_PER_IMAGE, replace=False)
+        negatives.append(features[negative])
+    return np.concatenate(positives), np.concatenate(negatives)
+
+def build_dataset(log_dir, boxes, negative_dir, rng):
+    """[(positives, negatives)] per image, so the split can be made by image"""
+    per_image = []
+    for image, image_boxes in boxes.items():
+        frame = cv2.imread(os.path.join(log_dir, image))
+        if frame is None or not image_boxes:
+            continue
+        grey = cv2.cvtColor(remove_annotations(frame), cv2.COLOR_BGR2GRAY)
+        per_image.append(image_samples(grey, image_boxes, rng))
+    if negative_dir:
+        for name in sorted(os.listdir(negative_dir)):
+            frame = cv2.imread(os.path.join(negative_dir, name))
+            if frame is not None:
+                per_image.append(image_samples(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), [], rng))
+    return per_image
+
+def stack(samples):
+    positives = np.concatenate([p for p, _ in samples])
+    negatives = np.concatenate([n for _, n in samples])
+    X = np.concatenate([positives, negatives]).astype(np.float32)
+    y = np.concatenate([np.ones(len(positives)), np.zeros(len(negatives))]).astype(np.float32)
+    return X, y
+
+def train_logistic(X, y, epochs, lr=0.5, l2=1e-3):
+    """Class-balanced L2 logistic regression on standardised features, full-batch gradient descent"""
+    mean, std = X.mean(axis=0), X.std(axis=0) + 1e-6
+    Z = (X - mean) / std
+    sample_weight = np.where(y == 1, 0.5 / y.sum(), 0.5 / (len(y) - y.sum()))
+    weights, bias = np.zeros(X.shape[1], np.float32), 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(Z @ weights + bias)))
+        error = (p - y) * sample_weight
+        weights -= lr * (Z.T @ error + l2 * weights)
+        bias -= lr * error.sum()
+    return weights, bias, mean, std
+
+def main(args):
+    rng = np.random.default_rng(0)
+    boxes = parse_detection_logs(args.logs)
+    print(f"📄 {sum(len(b) for b in boxes.values())} keyword boxes in {len(boxes)} snapshots")
+    samples = build_dataset(args.logs, boxes, args.negatives, rng)
+    if not samples:
+        print("❌ No usable snapshots found")
+        return
+
+    order = rng.permutation(len(samples))
+    n_val = max(1, int(len(samples) * args.val_split)) if len(samples) > 1 else 0
+    val = [samples[i] for i in order[:n_val]]
+    train = [samples[i] for i in order[n_val:]]
+    X, y = stack(train)
+    print(f"🧮 Training on {int(y.sum())} positive / {int(len(y) - y.sum())} negative windows")
+    weights, bias, mean, std = train_logistic(X, y, args.epochs)
+
+    X_val, y_val = stack(val) if val else (X, y)
+    scores = ((X_val - mean) / std) @ weights + bias
+    positive_scores = np.sort(scores[y_val == 1])
+    if len(positive_scores) == 0:
+        print("❌ No positive windows to set the threshold on")
+        return
+    threshold = positive_scores[int((1 - args.target_recall) * len(positive_scores))]
+    recall = (positive_scores >= threshold).mean()
+    false_rate = (scores[y_val == 0] >= threshold).mean() if (y_val == 0).any() else 0.0
+    print(f"📊 Held-out windows: recall {recall:.3f} | false positive rate {false_rate:.3f} "
+          f"at threshold {threshold:.3f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    np.savez(args.out, weights=weights, bias=bias, mean=mean, std=std, threshold=threshold,
+             window=np.array(WINDOW), feature_size=FEATURE_SIZE)
+    print(f"✅ Model written to: {args.out}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the sign-present classifier from OCR logs.")
+    parser.add_argument("--logs", default=os.path.expanduser("~/dev/ORB_SLAM3/Maps/OCR_Logs"),
+                        help="Directory with ocr_*.jpg snapshots and ocr_detections_*.txt")
+    parser.add_argument("--negatives", help="Directory of frames without signs")
+    parser.add_argument("--out", default=os.path.expanduser("~/dev/ORB_SLAM3/Models/sign_classifier.npz"),
+                        help="Output model")
+    parser.add_argument("--target-recall", type=float, default=0.97, help="Held-out sign-window recall to keep")
+    parser.add_argument("--val-split", type=float, default=0.2, help="Fraction of snapshots held out")
+    parser.add_argument("--epochs", type=int, default=300, help="Gradient descent iterations")
+    main(parser.parse_args())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# Deferred high-quality OCR for near-miss frames.
+# While the robot surveys, OCR runs at reduced quality to leave CPU for SLAM.
+# Frames whose reads came close to a keyword without passing are spilled to
+# disk (JPEG + JSON with the capture pose); when the robot is parked and the
+# CPU is quiet, a low-priority thread re-reads them with a slow full-resolution
+# configuration and reports any upgraded detections with the original pose.
+import difflib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import cv2
+import numpy as np
+from motor_state import read_motor_state
+from rectify import rectify_crops, scale_boxes
+
+NEAR_MISS_RATIO = 0.75  # difflib similarity to a keyword that makes a read a near miss
+HQ_UPSCALE = 1.5        # high-quality pass detects on an upscaled full-resolution frame
+HQ_HEIGHT = 64
+
+def near_misses(results, keywords, confidence_threshold, min_confidence):
+    """Keywords a frame nearly read: low confidence, or a misspelt word close to a keyword"""
+    confirmed, nearly = set(), set()
+    for _, text, conf in results:
+        clean_text = text.upper().strip()
+        if conf >= confidence_threshold:
+            confirmed.update(k for k in keywords if k in clean_text)
+        if conf < min_confidence:
+            continue
+        for keyword in keywords:
+            if conf < confidence_threshold and keyword in clean_text:
+                nearly.add(keyword)
+            elif keyword not in clean_text and any(
+                    difflib.SequenceMatcher(None, word, keyword).ratio() >= NEAR_MISS_RATIO
+                    for word in clean_text.split()):
+                nearly.add(keyword)
+    return nearly - confirmed
+
+def system_idle(max_load, parked_seconds):
+    """True when the load average per core is low and the motors have been stopped a while"""
+    if os.getloadavg()[0] / (os.cpu_count() or 1) > max_load:
+        return False
+    state = read_motor_state()
+    if state is None:
+        return True  # no motor publisher: go by load alone
+    command, _, _, since = state
+    return command == "stop" and time.time() - since >= parked_seconds
+
+class DeferredQueue:
+    """Candidate frames persisted as <id>.jpg + <id>.json, oldest first, bounded in count"""
+
+    def __init__(self, directory, max_items=500, min_interval=1.0):
+        self.directory = directory
+        self.max_items = max_items
+        self.min_interval = min_interval
+        self.last_spill = 0.0
+        self.spilled = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def pending(self):
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def __len__(self):
+        return len(self.pending())
+
+    def spill(self, frame, pose, keywords):
+        now = time.time()
+        if now - self.last_spill < self.min_interval:
+            return False  # consecutive frames of the same sign add nothing
+        self.last_spill = now
+        # time-ordered ids so the oldest candidate is drained (and evicted) first
+        item_id = f"{now:017.6f}_{uuid.uuid4().hex[:6]}"
+        cv2.imwrite(os.path.join(self.directory, f"{item_id}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        meta = {"captured": now, "timestamp": time.strftime("%Y%m%d_%H%M%S", time.localtime(now)),
+                "pose": pose, "near_misses": sorted(keywords)}
+        tmp_path = os.path.join(self.directory, f"{item_id}.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.directory, f"{item_id}.json"))  # the json marks it complete
+        self.spilled += 1
+        for old_id in self.pending()[:-self.max_items]:
+            self.remove(old_id)
+        return True
+
+    def load(self, item_id):
+        with open(os.path.join(self.directory, f"{item_id}.json")) as f:
+            meta = json.load(f)
+        return cv2.imread(os.path.join(self.directory, f"{item_id}.jpg")), meta
+
+    def remove(self, item_id):
+        for suffix in (".json", ".jpg"):
+            try:
+                os.remove(os.path.join(self.directory, item_id + suffix))
+            except FileNotFoundError:
+                pass
+
+def high_quality_readtext(backend, frame, batch_size):
+    """Slow pass: detection on an upscaled full-resolution frame, rectified crops"""
+    grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    grey = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(grey)
+    large = cv2.resize(grey, None, fx=HQ_UPSCALE, fy=HQ_UPSCALE, interpolation=cv2.INTER_CUBIC)
+    image_list = rectify_crops(large, backend.detect_boxes(large), HQ_HEIGHT)
+    if not image_list:
+        return []
+    results = backend.recognize(image_list, batch_size)
+    return [(np.round(scale_boxes([box], 1.0 / HQ_UPSCALE)[0]).astype(int).tolist(), text, conf)
+            for box, text, conf in results]
+
+class DeferredWorker(threading.Thread):
+    """Drains a DeferredQueue at the lowest CPU priority while the robot is idle.
+
+    The backend is built on first use and released once the queue is empty or
+    the robot stops being idle, so its memory is only held while it is working.
+    """
+
+    def __init__(self, queue, create_backend, on_result, idle_check, batch_size=8, poll_seconds=5.0,
+                 max_backoff=600.0):
+        super().__init__(name="deferred-ocr", daemon=True)
+        self.queue = queue
+        self.create_backend = create_backend
+        self.on_result = on_result
+        self.idle_check = idle_check
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_backoff = max_backoff
+        self.failures = 0  # backend failures in a row; each doubles the wait before the next try
+        self.stop_event = threading.Event()
+        self.backend = None
+        self.processed = 0
+
+    def run(self):
+        try:
+            # Linux applies niceness per thread; the SLAM and capture threads keep their priority
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError) as e:
+            logging.warning(f"Deferred OCR could not lower its priority: {e}")
+        while not self.stop_event.is_set():
+            pending = self.queue.pending()
+            if not pending or not self.idle_check():
+                self.release()
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            if not self.process(pending[0]):
+                self.release()
+                backoff = min(self.poll_seconds * 2 ** self.failures, self.max_backoff)
+                logging.info(f"Deferred OCR: retrying in {backoff:.0f}s")
+                self.stop_event.wait(backoff)
+        self.release()
+
+    def process(self, item_id):
+        """False if the backend failed; the item then stays queued for a later try"""
+        try:
+            frame, meta = self.queue.load(item_id)
+            if frame is None:
+                raise ValueError("image missing")
+        except Exception as e:
+            logging.error(f"Deferred OCR: dropping unreadable {item_id}: {e}")
+            self.queue.remove(item_id)
+            return True
+        try:
+            if self.backend is None:
+                logging.info("Deferred OCR: robot idle, loading high-quality backend")
+                self.backend = self.create_backend()
+            results = high_quality_readtext(self.backend, frame, self.batch_size)
+            self.on_result(frame, meta, results)
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"Deferred OCR of {item_id} failed ({self.failures} in a row), keeping it: {e}")
+            return False
+        self.failures = 0
+        self.processed += 1
+        self.queue.remove(item_id)
+        return True
+
+    def release(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
@@ -3,6 +3,8 @@ import time
 import os
 from gpiozero import PWMOutputDevice, Device
 from gpiozero.pins.lgpio import LGPIOFactory
+from motor_state import write_motor_state
+import profiler
 
 # Use LGPIOFactory for GPIO access
 Device.pin_factory = LGPIOFactory()
@@ -54,6 +56,13 @@ def control_motors(command):
     else:
         print("[WARNING] Unknown command.")
         set_motor(0, 0, 0, 0)
+        command = "stop"
+    try:
+        # lets ocr_monitor.py schedule OCR around how the robot is moving
+        write_motor_state(command, CURRENT_SPEED, TURN_SPEED)
+    except OSError as e:
+        with open("/home/jay/dev/ORB_SLAM3/Logs/gpio_errors.log", "a") as f:
+            f.write(f"[{time.strftime('%Y%m%d_%H%M%S')}] Motor State Error: {e}\n")
 
 @app.route("/", methods=["GET"])
 def index():
@@ -245,6 +254,8 @@ HTML = '''
 '''
 
 if __name__ == "__main__":
+    # `pkill -USR1 -f flask_motor.py` to profile (see profiler.py)
+    profiler.install("flask_motor", "/home/jay/dev/ORB_SLAM3/Logs/profiles", log=print)
     app.run(host="0.0.0.0", port=5000)
 
 
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# Frame broker: reads the SLAM frame pipe once and fans the frames out.
+# Only one process can read /tmp/frames.pipe. The broker is that process: it
+# copies each frame into a slot of one shared-memory block and tells every
+# subscriber (over a Unix socket) which slot to read; a slot is reused once
+# every subscriber that was sent it has released it. Each subscriber picks a
+# drop policy:
+#   latest    only the newest unread frame is kept (OCR, live preview)
+#   lossless  up to MAX_PENDING unread frames are queued (recorder)
+# A slow subscriber only ever loses its own frames; the pipe is always drained.
+#
+#   python frame_broker.py                      # serve /tmp/frames.pipe on /tmp/frames.sock
+#   python frame_broker.py --watch lossless     # subscribe and print the rate seen
+import argparse
+import json
+import logging
+import os
+import select
+import socket
+import struct
+import time
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+PIPE_PATH = "/tmp/frames.pipe"
+SOCKET_PATH = "/tmp/frames.sock"
+SHM_NAME = "frame_broker"
+SLOTS = 16
+SLOT_BYTES = 1280 * 720 * 3  # largest frame carried; bigger ones are dropped
+MAX_PENDING = 8              # unread frames a lossless subscriber may fall behind
+MAX_INFLIGHT = 2             # frames sent to a subscriber and not yet released
+
+NOTICE = struct.Struct('!IQddIII')  # slot, sequence number, capture time (0 if unstamped), pipe read time, rows, cols, channels
+RELEASE = struct.Struct('!I')      # slot
+POLICIES = ("latest", "lossless")
+# A writer that knows when it grabbed a frame sets this bit in the type code and
+# follows the 12-byte header with STAMP; plain headers are still read as before.
+STAMPED = 0x10000
+STAMP = struct.Struct('dQ')  # capture time (seconds since the epoch), writer's frame number
+
+def read_exact(fd, size):
+    data = bytearray()
+    while len(data) < size:
+        try:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                return None
+            data.extend(chunk)
+        except BlockingIOError:
+            time.sleep(0.005)
+    return data
+
+def read_frame(fd):
+    """Next BGR frame from the pipe (12-byte rows, cols, type header + pixels), or None"""
+    frame, _ = read_stamped_frame(fd)
+    return frame
+
+def read_stamped_frame(fd):
+    """(frame or None, capture time or None); the time is only known when the writer stamps frames"""
+    header = read_exact(fd, 12)
+    if not header or len(header) != 12:
+        return None, None
+
+    rows, cols, type_code = struct.unpack('III', header)
+    capture_time = None
+    if type_code & STAMPED:
+        stamp = read_exact(fd, STAMP.size)
+        if not stamp or len(stamp) != STAMP.size:
+            return None, None
+        capture_time, _ = STAMP.unpack(stamp)
+        type_code &= ~STAMPED
+
+    if type_code == 16:  # CV_8UC3
+        channels = 3
+        dtype = np.uint8
+    else:
+        logging.warning(f"Unsupported frame type: {type_code}")
+        return None, None
+
+    frame_size = rows * cols * channels * np.dtype(dtype).itemsize
+    frame_data = read_exact(fd, frame_size)
+    if not frame_data or len(frame_data) != frame_size:
+        logging.warning("Incomplete raw frame received")
+        return None, None
+
+    return np.frombuffer(frame_data, dtype=dtype).reshape((rows, cols, channels)), capture_time
+
+class PipeReader:
+    """The SLAM pipe itself as a frame source"""
+
+    def __init__(self, path=PIPE_PATH):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        self.last_time = None     # when the last frame was read from the pipe
+        self.last_capture = None  # when the writer grabbed it, if it stamps frames
+
+    def fileno(self):
+        return self.fd
+
+    def read(self):
+        frame, capture_time = read_stamped_frame(self.fd)
+        if frame is not None:
+            self.last_time, self.last_capture = time.time(), capture_time
+        return frame
+
+    def close(self):
+        os.close(self.fd)
+
+class FrameSubscriber:
+    """A broker subscription; read() returns frames like PipeReader.read()"""
+
+    def __init__(self, path=SOCKET_PATH, name="subscriber", policy="latest", timeout=0.1):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.sock.connect(path)
+        self.sock.send(json.dumps({"name": name, "policy": policy}).encode())
+        info = json.loads(self.sock.recv(4096))
+        self.shm = shared_memory.SharedMemory(info["shm"])
+        # the broker owns the block; don't let this process's tracker unlink it at exit
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.slot_bytes = info["slot_bytes"]
+        self.sock.settimeout(timeout)
+        self.closed = False
+        self.last_seq = None
+        self.last_time = None     # when the broker read the last frame from the pipe
+        self.last_capture = None  # when the writer grabbed it, if it stamps frames
+        self.frames = 0
+        self.missed = 0        # frames the broker dropped for this subscriber
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read(self):
+        """Next frame (a private copy), or None on timeout or once the broker has gone"""
+        if self.closed:
+            return None
+        try:
+            message = self.sock.recv(NOTICE.size)
+        except socket.timeout:
+            return None
+        if not message:
+            logging.error(f"Frame broker at {self.path} closed the subscription")
+            self.closed = True
+            return None
+        slot, seq, capture_time, read_time, rows, cols, channels = NOTICE.unpack(message)
+        size = rows * cols * channels
+        frame = np.frombuffer(self.shm.buf, np.uint8, size, slot * self.slot_bytes).reshape(rows, cols, channels).copy()
+        self.sock.send(RELEASE.pack(slot))
+        if self.last_seq is not None and seq > self.last_seq + 1:
+            self.missed += seq - self.last_seq - 1
+        self.last_seq, self.last_time = seq, read_time
+        self.last_capture = capture_time or None
+        self.frames += 1
+        return frame
+
+    def close(self):
+        self.sock.close()
+        self.shm.close()
+
+class Subscriber:
+    """Broker-side state of one connection"""
+
+    def __init__(self, conn, name, policy):
+        self.conn = conn
+        self.name = name
+        self.policy = policy
+        self.pending = deque()  # (slot, notice) not yet sent
+        self.inflight = set()   # slots sent and not yet released
+        self.sent = 0
+        self.dropped = 0
+
+class FrameBroker:
+    def __init__(self, pipe_path=PIPE_PATH, socket_path=SOCKET_PATH, slots=SLOTS, slot_bytes=SLOT_BYTES,
+                 max_pending=MAX_PENDING, max_inflight=MAX_INFLIGHT):
+        self.pipe_path = pipe_path
+        self.socket_path = socket_path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        try:
+            # left over from a broker that was killed
+            stale = shared_memory.SharedMemory(SHM_NAME)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(SHM_NAME, create=True, size=slots * slot_bytes)
+        self.refs = [0] * slots
+        self.subscribers = {}  # fd -> Subscriber
+        self.seq = 0
+        self.frames_in = 0
+        self.frames_dropped = 0  # no free slot or too large
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.listener.bind(socket_path)
+        self.listener.listen()
+        self.pipe = None
+
+    def accept(self):
+        conn, _ = self.listener.accept()
+        conn.settimeout(1.0)
+        try:
+            hello = json.loads(conn.recv(4096))
+            policy = hello.get("policy", "latest")
+            if policy not in POLICIES:
+                raise ValueError(f"unknown policy {policy!r}")
+            conn.send(json.dumps({"shm": SHM_NAME, "slot_bytes": self.slot_bytes, "slots": self.slots}).encode())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Rejected subscriber: {e}")
+            conn.close()
+            return
+        conn.setblocking(False)
+        subscriber = Subscriber(conn, hello.get("name", "?"), policy)
+        self.subscribers[conn.fileno()] = subscriber
+        logging.info(f"Subscriber {subscriber.name} connected ({policy})")
+
+    def release(self, slot):
+        self.refs[slot] -= 1
+
+    def disconnect(self, subscriber):
+        for slot, _ in subscriber.pending:
+            self.release(slot)
+        for slot in subscriber.inflight:
+            self.release(slot)
+        del self.subscribers[subscriber.conn.fileno()]
+        subscriber.conn.close()
+        logging.info(f"Subscriber {subscriber.name} left ({subscriber.sent} sent, {subscriber.dropped} dropped)")
+
+    def pump(self, subscriber):
+        while subscriber.pending and len(subscriber.inflight) < self.max_inflight:
+            slot, notice = subscriber.pending.popleft()
+            try:
+                subscriber.conn.send(notice)
+            except OSError:
+                self.release(slot)
+                self.disconnect(subscriber)
+                return
+            subscriber.inflight.add(slot)
+            subscriber.sent += 1
+
+    def handle_releases(self, subscriber):
+        while True:
+            try:
+                message = subscriber.conn.recv(RELEASE.size)
+            except BlockingIOError:
+                break
+            except OSError:
+                message = b""
+            if not message:
+                self.disconnect(subscriber)
+                return
+            (slot,) = RELEASE.unpack(message)
+            if slot in subscriber.inflight:
+                subscriber.inflight.remove(slot)
+                self.release(slot)
+        self.pump(subscriber)
+
+    def free_slot(self):
+        for slot, refs in enumerate(self.refs):
+            if refs == 0:
+                return slot
+        # every slot is held: take the oldest unsent frame of the subscriber furthest behind
+        for subscriber in sorted(self.subscribers.values(), key=lambda s: len(s.pending), reverse=True):
+            if subscriber.pending:
+                slot, _ = subscriber.pending.popleft()
+                subscriber.dropped += 1
+                self.release(slot)
+                if self.refs[slot] == 0:
+                    return slot
+        return None
+
+    def publish(self, frame, capture_time=None):
+        self.frames_in += 1
+        self.seq += 1
+        if frame.nbytes > self.slot_bytes:
+            self.frames_dropped += 1
+            return
+        if not self.subscribers:
+            return
+        slot = self.free_slot()
+        if slot is None:
+            self.frames_dropped += 1  # every slot is in a subscriber's hands; never wait for them
+            return
+        np.ndarray(frame.shape, np.uint8, self.shm.buf, slot * self.slot_bytes)[:] = frame
+        notice = NOTICE.pack(slot, self.seq, capture_time or 0.0, time.time(), *frame.shape)
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.policy == "latest":
+                while subscriber.pending:
+                    old_slot, _ = subscriber.pending.popleft()
+                    self.release(old_slot)
+                    subscriber.dropped += 1
+            elif len(subscriber.pending) >= self.max_pending:
+                old_slot, _ = subscriber.pending.popleft()
+                self.release(old_slot)
+                subscriber.dropped += 1
+            self.refs[slot] += 1
+            subscriber.pending.append((slot, notice))
+            self.pump(subscriber)
+
+    def stats(self):
+        parts = [f"{s.name} ({s.policy}) {s.sent} sent/{s.dropped} dropped" for s in self.subscribers.values()]
+        return (f"Broker: {self.frames_in} frames in | {self.frames_dropped} dropped at ingest | "
+                f"{', '.join(parts) or 'no subscribers'}")
+
+    def serve_forever(self, stats_seconds=30.0):
+        last_stats = time.time()
+        while True:
+            if self.pipe is None and os.path.exists(self.pipe_path):
+                self.pipe = PipeReader(self.pipe_path)
+                logging.info(f"Reading frames from {self.pipe_path}")
+            fds = [self.listener] + [s.conn for s in self.subscribers.values()]
+            if self.pipe is not None:
+                fds.append(self.pipe)
+            readable, _, _ = select.select(fds, [], [], 0.5)
+            for item in readable:
+                if item is self.listener:
+                    self.accept()
+                elif item is self.pipe:
+                    frame = self.pipe.read()
+                    if frame is not None:
+                        self.publish(frame, self.pipe.last_capture)
+                    else:
+                        time.sleep(0.01)  # no writer yet
+                else:
+                    subscriber = self.subscribers.get(item.fileno())
+                    if subscriber is not None:
+                        self.handle_releases(subscriber)
+            if time.time() - last_stats >= stats_seconds:
+                last_stats = time.time()
+                logging.info(self.stats())
+
+    def close(self):
+        for subscriber in list(self.subscribers.values()):
+            self.disconnect(subscriber)
+        self.listener.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        if self.pipe is not None:
+            self.pipe.close()
+        self.shm.close()
+        self.shm.unlink()
+
+def watch(socket_path, policy, seconds=5.0):
+    """Subscribe and report the frame rate and losses seen, every `seconds`"""
+    subscriber = FrameSubscriber(socket_path, f"watch-{os.getpid()}", policy)
+    start, frames = time.time(), 0
+    try:
+        while not subscriber.closed:
+            if subscriber.read() is not None:
+                frames += 1
+            if time.time() - start >= seconds:
+                print(f"{frames / (time.time() - start):.1f} FPS | {subscriber.missed} missed")
+                start, frames = time.time(), 0
+    finally:
+        subscriber.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fan frames from the SLAM pipe out to several readers.")
+    parser.add_argument("--pipe", default=PIPE_PATH)
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--slots", type=int, default=SLOTS, help="Shared-memory frame slots")
+    parser.add_argument("--watch", choices=POLICIES, help="Subscribe to a running broker and print its rate")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.watch:
+        watch(args.socket, args.watch)
+    else:
+        broker = FrameBroker(args.pipe, args.socket, args.slots)
+        logging.info(f"Frame broker listening on {args.socket}")
+        try:
+            broker.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Shutting down by user request")
+        finally:
+            broker.close()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Cheap blur/exposure score for a frame, computed on a downscaled luma image.
+# Frames grabbed mid-turn are motion-blurred and a full OCR pass on them
+# finds nothing; scoring them first costs well under a millisecond.
+from collections import namedtuple
+import cv2
+import numpy as np
+
+QUALITY_WIDTH = 160  # luma image width the score is computed at
+DARK_LEVEL = 8       # pixels at or below count as crushed blacks
+BRIGHT_LEVEL = 247   # pixels at or above count as blown highlights
+
+FrameQuality = namedtuple("FrameQuality", "sharpness mean dark bright")
+
+def frame_quality(frame, width=QUALITY_WIDTH):
+    """Laplacian variance, mean level and clipped-pixel fractions"""
+    scale = width / frame.shape[1]
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    luma = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    sharpness = cv2.Laplacian(luma, cv2.CV_32F).var()
+    hist = np.bincount(luma.ravel(), minlength=256) / luma.size
+    mean = float(np.dot(hist, np.arange(256)))
+    return FrameQuality(float(sharpness), mean, float(hist[:DARK_LEVEL + 1].sum()),
+                        float(hist[BRIGHT_LEVEL:].sum()))
+
+def quality_problem(quality, min_sharpness, mean_range, max_clipped):
+    """Why a frame should be skipped, or None if it is good enough for OCR"""
+    # exposure first: a dark frame also has a low Laplacian variance
+    if not mean_range[0] <= quality.mean <= mean_range[1]:
+        return "underexposed" if quality.mean < mean_range[0] else "overexposed"
+    if quality.dark + quality.bright > max_clipped:
+        return "clipped"
+    if quality.sharpness < min_sharpness:
+        return "blurred"
+    return None
+
+def format_quality(quality):
+    return (f"sharpness {quality.sharpness:.1f} | mean {quality.mean:.1f} | "
+            f"clipped {100 * quality.dark:.1f}% dark, {100 * quality.bright:.1f}% bright")
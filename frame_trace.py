@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# Frame latency tracing: how old is a frame by the time its detection is logged?
+# Every frame handed to OCR gets a trace of wall-clock points: capture (when
+# the pipe writer stamps its frames, see frame_broker.read_stamped_frame), pipe
+# read, OCR start, detection done, recognition done and the detection log
+# write. Finished traces are appended to a Chrome trace file in the JSON array
+# format, one event per line and without the optional closing bracket, so a
+# killed run still leaves a readable file; chrome://tracing and
+# ui.perfetto.dev open it directly, one row per frame.
+#
+#   python frame_trace.py LOG_DIR/trace_20250101_120000.json   # latency percentiles and where the time went
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict, deque
+import numpy as np
+
+# (stage, from point, to point); a stage is left out when either point is missing
+STAGES = (
+    ("pipe", "capture", "read"),          # writer to OCR process (includes broker hand-off)
+    ("wait", "read", "ocr_start"),        # frame held until the scheduler gave it OCR
+    ("detect", "ocr_start", "detected"),  # gate, preprocessing, templates, text detection
+    ("recognize", "detected", "recognized"),  # batch wait + recognizer pass
+    ("log", "recognized", "logged"),      # templates, cooldown, snapshot and log write
+)
+POINTS = ("capture", "read", "ocr_start", "detected", "recognized", "logged")
+PERCENTILES = (50, 90, 99)
+
+class FrameTrace:
+    def __init__(self, frame_id, camera, times):
+        self.id = frame_id
+        self.camera = camera
+        self.times = times  # point -> wall-clock seconds
+
+    def mark(self, point, at=None):
+        self.times[point] = time.time() if at is None else at
+
+class FrameTracer:
+    """Writes finished frame traces to `path` and keeps recent capture-to-log latencies for stats()"""
+
+    def __init__(self, path, flush_every=20, window=500):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a')
+        if new:
+            self.file.write("[\n")
+        self.pid = os.getpid()
+        self.flush_every = flush_every
+        self.buffer = []
+        self.next_id = 0
+        self.threads = {}  # camera -> tid
+        self.outcomes = Counter()
+        self.latencies = deque(maxlen=window)  # seconds from first point to logged, logged frames only
+
+    def begin(self, camera, capture_time=None, read_time=None, start=None):
+        times = {"ocr_start": time.time() if start is None else start}
+        if capture_time is not None:
+            times["capture"] = capture_time
+        if read_time is not None:
+            times["read"] = read_time
+        self.next_id += 1
+        return FrameTrace(self.next_id, camera, times)
+
+    def event(self, phase, name, ts, trace, args=None):
+        event = {"name": name, "cat": "frame", "ph": phase, "id": trace.id, "pid": self.pid,
+                 "tid": self.threads[trace.camera], "ts": int(ts * 1e6)}
+        if args:
+            event["args"] = args
+        self.buffer.append(json.dumps(event, separators=(",", ":")))
+
+    def finish(self, trace, outcome):
+        if trace.camera not in self.threads:
+            self.threads[trace.camera] = len(self.threads) + 1
+            self.buffer.append(json.dumps({"name": "thread_name", "ph": "M", "pid": self.pid,
+                                           "tid": self.threads[trace.camera], "args": {"name": str(trace.camera)}},
+                                          separators=(",", ":")))
+        times = trace.times
+        first, last = min(times.values()), max(times.values())
+        self.event("b", "frame", first, trace, {"camera": trace.camera, "outcome": outcome})
+        for stage, start, end in STAGES:
+            if start in times and end in times:
+                self.event("b", stage, times[start], trace)
+                self.event("e", stage, times[end], trace)
+        self.event("e", "frame", last, trace)
+        self.outcomes[outcome] += 1
+        if "logged" in times:
+            self.latencies.append(times["logged"] - first)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("".join(line + ",\n" for line in self.buffer))
+            self.file.flush()
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def stats(self):
+        latency = "no frames logged yet"
+        if self.latencies:
+            p50, p90 = np.percentile(self.latencies, [50, 90])
+            latency = f"to log p50 {1000 * p50:.0f} ms, p90 {1000 * p90:.0f} ms"
+        outcomes = ", ".join(f"{count} {outcome}" for outcome, count in self.outcomes.most_common())
+        return f"Trace: {sum(self.outcomes.values())} frames ({outcomes or 'none'}) | {latency}"
+
+def load_events(path):
+    """Events of a trace file, whether or not the writer closed the array"""
+    with open(path) as f:
+        text = f.read().strip()
+    if not text.endswith("]"):
+        text = text.rstrip(",") + "]"
+    return json.loads(text)
+
+def frame_records(events):
+    """{frame id: {"outcome", "camera", "stages": {stage: seconds}, "total": seconds}} from trace events"""
+    frames = defaultdict(lambda: {"stages": {}, "open": {}})
+    for event in events:
+        if event.get("cat") != "frame":
+            continue
+        record = frames[(event["pid"], event["id"])]
+        ts = event["ts"] / 1e6
+        if event["ph"] == "b":
+            record["open"][event["name"]] = ts
+            if event["name"] == "frame":
+                record.update(event.get("args", {}))
+        elif event["ph"] == "e" and event["name"] in record["open"]:
+            duration = ts - record["open"].pop(event["name"])
+            if event["name"] == "frame":
+                record["total"] = duration
+            else:
+                record["stages"][event["name"]] = duration
+    for record in frames.values():
+        del record["open"]
+    return dict(frames)
+
+def summarize(records):
+    lines = []
+    outcomes = Counter(record.get("outcome", "?") for record in records.values())
+    lines.append(f"{len(records)} traced frames: " + ", ".join(f"{n} {o}" for o, n in outcomes.most_common()))
+    logged = [record for record in records.values() if record.get("outcome") == "logged" and "total" in record]
+    if not logged:
+        lines.append("No logged detections to measure")
+        return "\n".join(lines)
+    captured = sum(1 for record in logged if "pipe" in record["stages"])
+    totals = np.array([record["total"] for record in logged])
+    origin = "capture" if captured == len(logged) else f"pipe read ({captured}/{len(logged)} frames capture-stamped)"
+    lines.append(f"{origin} to log over {len(logged)} logged frames: " +
+                 ", ".join(f"p{p} {1000 * v:.0f} ms" for p, v in zip(PERCENTILES, np.percentile(totals, PERCENTILES))) +
+                 f", max {1000 * totals.max():.0f} ms")
+    lines.append(f"{'stage':<10} {'p50 ms':>8} {'p90 ms':>8} {'share':>6}")
+    for stage, _, _ in STAGES:
+        durations = np.array([record["stages"][stage] for record in logged if stage in record["stages"]])
+        if not len(durations):
+            continue
+        p50, p90 = np.percentile(durations, [50, 90])
+        lines.append(f"{stage:<10} {1000 * p50:>8.1f} {1000 * p90:>8.1f} {100 * durations.sum() / totals.sum():>5.0f}%")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise frame latency traces written by ocr_monitor.py.")
+    parser.add_argument("traces", nargs="+", help="trace_*.json files")
+    args = parser.parse_args()
+    events = []
+    for path in args.traces:
+        events.extend(load_events(path))
+    print(summarize(frame_records(events)))
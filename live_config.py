@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Settings that can change while ocr_monitor.py runs.
+# A JSON file of {"SETTING_NAME": value} overrides is polled by mtime (one stat
+# every few seconds). A changed file is validated as a whole, against the types
+# of the built-in defaults and any per-setting checks, and handed back as one
+# set of changes, so the monitor never runs a frame with half a file applied;
+# a file with any bad value is rejected and the last good settings stay. Deleting the file
+# returns every setting to its default.
+import json
+import logging
+import os
+import threading
+import time
+
+def coerce(name, value, default):
+    """value converted to the type of default, or ValueError"""
+    if default is None or value is None:
+        return value  # optional settings take whatever the file says
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be true or false")
+        return value
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number")
+        if isinstance(default, int) and value != int(value):
+            raise ValueError(f"{name} must be a whole number")
+        return type(default)(value)
+    if isinstance(default, (list, tuple)):
+        if not isinstance(value, list):
+            raise ValueError(f"{name} must be a list")
+        if isinstance(default, tuple) and len(value) != len(default):
+            raise ValueError(f"{name} must have {len(default)} items")
+        return type(default)(value)
+    if not isinstance(value, type(default)):
+        raise ValueError(f"{name} must be a {type(default).__name__}")
+    return value
+
+def one_of(choices):
+    def check(name, value):
+        if value not in choices:
+            raise ValueError(f"{name} must be one of {', '.join(map(str, choices))}")
+    return check
+
+def in_range(low=None, high=None):
+    """Check that a number (or every number of a list) lies in low..high"""
+    def check(name, value):
+        for v in (value if isinstance(value, (list, tuple)) else [value]):
+            if (low is not None and v < low) or (high is not None and v > high):
+                raise ValueError(f"{name} must be within {low if low is not None else '-inf'}.."
+                                 f"{high if high is not None else 'inf'}")
+    return check
+
+def positive(name, value):
+    if value <= 0:
+        raise ValueError(f"{name} must be greater than 0")
+
+class ConfigWatcher:
+    def __init__(self, path, defaults, poll_seconds=2.0, checks=None):
+        self.path = path
+        self.defaults = dict(defaults)
+        self.checks = checks or {}  # name -> check(name, value), raising ValueError
+        self.current = dict(defaults)
+        self.poll_seconds = poll_seconds
+        self.mtime = None
+        self.last_poll = 0.0
+        self.reloads = 0
+
+    def load(self):
+        with open(self.path) as f:
+            overrides = json.load(f)
+        if not isinstance(overrides, dict):
+            raise ValueError("expected an object of SETTING: value")
+        unknown = sorted(set(overrides) - set(self.defaults))
+        if unknown:
+            raise ValueError(f"not reloadable: {', '.join(unknown)}")
+        settings = {name: coerce(name, value, self.defaults[name]) for name, value in overrides.items()}
+        for name, value in settings.items():
+            if name in self.checks and value is not None:
+                self.checks[name](name, value)
+        return settings
+
+    def poll(self, now=None):
+        """{name: value} of settings that changed since the last poll; {} most of the time"""
+        now = time.time() if now is None else now
+        if now - self.last_poll < self.poll_seconds:
+            return {}
+        self.last_poll = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime:
+            return {}
+        self.mtime = mtime
+        overrides = {}
+        if mtime is not None:
+            try:
+                overrides = self.load()
+            except (OSError, ValueError) as e:
+                # keep running on the last good settings until the file is fixed
+                logging.warning(f"Ignoring {self.path}, keeping the last good settings: {e}")
+                return {}
+        wanted = dict(self.defaults, **overrides)
+        changed = {name: value for name, value in wanted.items() if value != self.current[name]}
+        self.current = wanted
+        if changed:
+            self.reloads += 1
+        return changed
+
+class BackgroundBuild(threading.Thread):
+    """Runs factory() off the frame loop; result (or error) is set once the thread finishes"""
+
+    def __init__(self, factory, key=None):
+        super().__init__(name="config-rebuild", daemon=True)
+        self.factory = factory
+        self.key = key
+        self.result = None
+        self.error = None
+        self.start()
+
+    def run(self):
+        try:
+            self.result = self.factory()
+        except Exception as e:
+            self.error = e
+
+    def done(self):
+        return not self.is_alive()
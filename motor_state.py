@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Motor command state shared between flask_motor.py and ocr_monitor.py.
+# The last command is kept as a fixed-size record in /dev/shm (RAM-backed, so
+# no SD-card writes); the writer replaces the file atomically so a reader never
+# sees a torn record.
+import os
+import struct
+import time
+
+MOTOR_STATE_PATH = "/dev/shm/motor_state"
+RECORD = struct.Struct('<16sddd')  # command, linear speed, turn speed, time of command
+COMMANDS = ("forward", "backward", "left", "right", "stop")
+
+def write_motor_state(command, speed, turn_speed, path=MOTOR_STATE_PATH):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(RECORD.pack(command.encode()[:16], speed, turn_speed, time.time()))
+    os.replace(tmp_path, path)
+
+def read_motor_state(path=MOTOR_STATE_PATH):
+    """(command, speed, turn_speed, since) or None if flask_motor.py hasn't published yet"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(RECORD.size)
+    except OSError:
+        return None
+    if len(data) != RECORD.size:
+        return None
+    command, speed, turn_speed, since = RECORD.unpack(data)
+    return command.rstrip(b'\0').decode(errors='replace'), speed, turn_speed, since
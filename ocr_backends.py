@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# OCR engines behind one interface, so ocr_monitor.py can pick one by config
+# or by benchmark instead of each engine living in its own copy of the loop.
+import csv
+import importlib.util
+import logging
+import math
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+RECOGNIZER_HEIGHT = 64  # EasyOCR recognizer input height (easyocr.config.imgH)
+
+def detector_boxes(horizontal_list, free_list):
+    """EasyOCR-style [x_min, x_max, y_min, y_max] and free boxes as 4-point boxes"""
+    boxes = [[[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+             for x_min, x_max, y_min, y_max in horizontal_list]
+    return boxes + [list(box) for box in free_list]
+
+class OCRBackend:
+    """Common interface for OCR engines.
+
+    detect() returns (box, crop) pairs with 4-point boxes in image coordinates,
+    recognize() turns them into readtext-style (bbox, text, conf) tuples and
+    readtext() does both. detect_boxes() gives just the 4-point boxes, for
+    callers that cut their own crops (see rectify.py). Heavy imports happen in
+    __init__, never at import.
+    """
+    name = None
+    requires = ()          # modules that must be importable for this backend
+    supports_batch = False  # recognize() is faster with many crops per call
+
+    @classmethod
+    def available(cls):
+        return all(importlib.util.find_spec(module) is not None for module in cls.requires)
+
+    def detect(self, image):
+        raise NotImplementedError
+
+    def detect_boxes(self, image):
+        return [box for box, _ in self.detect(image)]
+
+    def recognize(self, image_list, batch_size=1):
+        raise NotImplementedError
+
+    def readtext(self, image, batch_size=1):
+        image_list = self.detect(image)
+        return self.recognize(image_list, batch_size) if image_list else []
+
+    def warmup(self, shape=(480, 640)):
+        """One throwaway pass so lazy allocations don't land on the first real frame"""
+        dummy = np.full(shape, 255, dtype=np.uint8)
+        cv2.putText(dummy, "PHARMACY", (40, shape[0] // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, 0, 5)
+        self.readtext(dummy)
+
+    def close(self):
+        """Release native handles/threads; the backend is unusable afterwards"""
+
+class EasyOCRBackend(OCRBackend):
+    """PyTorch EasyOCR, driven as separate detection and batched recognition"""
+    name = "easyocr"
+    requires = ("easyocr",)
+    supports_batch = True
+
+    def __init__(self):
+        import easyocr  # pulls in torch, so only when this backend is selected
+        self.reader = easyocr.Reader(['en'], gpu=False)
+
+    def detect(self, image):
+        from easyocr.utils import get_image_list
+        horizontal_list, free_list = self.reader.detect(image)
+        image_list, _ = get_image_list(horizontal_list[0], free_list[0], image, model_height=RECOGNIZER_HEIGHT)
+        return image_list
+
+    def detect_boxes(self, image):
+        horizontal_list, free_list = self.reader.detect(image)
+        return detector_boxes(horizontal_list[0], free_list[0])
+
+    def recognize(self, image_list, batch_size=1):
+        # Reader.recognize() walks crops one at a time on CPU, so call the recognizer directly.
+        # Crops are sorted by width so each batch pads to a similar width.
+        from easyocr.recognition import get_text
+        reader = self.reader
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        order = sorted(range(len(image_list)), key=lambda i: image_list[i][1].shape[1])
+        results = [None] * len(image_list)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            max_width = max(math.ceil(image_list[i][1].shape[1] / RECOGNIZER_HEIGHT) for i in chunk) * RECOGNIZER_HEIGHT
+            batch = get_text(reader.character, RECOGNIZER_HEIGHT, int(max_width), reader.recognizer, reader.converter,
+                             [image_list[i] for i in chunk], ignore_char, 'greedy', 5, batch_size,
+                             0.1, 0.5, 0.003, 0, reader.device)
+            for i, result in zip(chunk, batch):
+                results[i] = result
+        return results
+
+class OnnxBackend(OCRBackend):
+    """EasyOCR's models as int8 ONNX on the CPU provider; never imports torch"""
+    name = "onnx"
+    requires = ("onnxruntime",)
+    supports_batch = True
+
+    def __init__(self, model_dir, threads=0):
+        from onnx_ocr import OnnxReader
+        self.reader = OnnxReader(model_dir, threads)
+
+    @classmethod
+    def available(cls, model_dir=None):
+        if not super().available():
+            return False
+        from onnx_ocr import DETECTOR_FILE
+        return model_dir is None or os.path.exists(os.path.join(model_dir, DETECTOR_FILE))
+
+    def detect(self, image):
+        from onnx_ocr import get_image_list
+        horizontal_list, free_list = self.reader.detect(image)
+        return get_image_list(horizontal_list[0], free_list[0], image, model_height=RECOGNIZER_HEIGHT)
+
+    def detect_boxes(self, image):
+        horizontal_list, free_list = self.reader.detect(image)
+        return detector_boxes(horizontal_list[0], free_list[0])
+
+    def recognize(self, image_list, batch_size=1):
+        return self.reader.recognize(image_list, batch_size)
+
+def propose_text_regions(grey, min_height=12, margin=4):
+    """Cheap morphological text-line proposals for engines without a text detector"""
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(grey, cv2.MORPH_GRADIENT, kernel)
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # join characters of a line horizontally
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    img_h, img_w = grey.shape
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < min_height or w < 1.5 * h:
+            continue
+        if cv2.countNonZero(binary[y:y + h, x:x + w]) < 0.2 * w * h:
+            continue
+        x_min, y_min = max(0, x - margin), max(0, y - margin)
+        x_max, y_max = min(img_w, x + w + margin), min(img_h, y + h + margin)
+        boxes.append([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]])
+    return sorted(boxes, key=lambda box: box[0][1])
+
+class TesseractBackend(OCRBackend):
+    """Tesseract LSTM via pytesseract on morphological line proposals"""
+    name = "tesseract"
+    requires = ("pytesseract",)
+    supports_batch = False
+
+    LINE_HEIGHT = 48  # Tesseract reads best with ~30px x-height
+    CONFIG = r'--oem 1 --psm 7'  # LSTM engine, single text line per crop
+
+    def __init__(self, tesseract_cmd="/usr/bin/tesseract"):
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.pytesseract = pytesseract
+
+    def detect(self, image):
+        image_list = []
+        for box in propose_text_regions(image):
+            (x_min, y_min), (x_max, y_max) = box[0], box[2]
+            crop = image[y_min:y_max, x_min:x_max]
+            if crop.shape[0] < self.LINE_HEIGHT:
+                scale = self.LINE_HEIGHT / crop.shape[0]
+                crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+            image_list.append((box, crop))
+        return image_list
+
+    def detect_boxes(self, image):
+        return propose_text_regions(image)
+
+    def recognize(self, image_list, batch_size=1):
+        results = []
+        for box, crop in image_list:
+            data = self.pytesseract.image_to_data(crop, config=self.CONFIG,
+                                                  output_type=self.pytesseract.Output.DICT)
+            words = [(w, float(c)) for w, c in zip(data["text"], data["conf"]) if w.strip() and float(c) >= 0]
+            text = ' '.join(w for w, _ in words)
+            conf = sum(c for _, c in words) / (100 * len(words)) if words else 0.0
+            results.append((box, text, conf))
+        return results
+
+class TesserocrBackend(TesseractBackend):
+    """Tesseract through a pool of persistent tesserocr API handles.
+
+    No process spawn or temp file per frame: crops go straight from NumPy
+    buffers into already-initialised handles, and crops of one call are
+    spread over the pool (tesserocr releases the GIL while recognising).
+    """
+    name = "tesserocr"
+    requires = ("tesserocr",)
+    supports_batch = True
+
+    WORD_ASPECT = 4.0  # crops narrower than this (w/h) are read as a single word
+
+    def __init__(self, pool_size=2, tessdata=None, lang="eng"):
+        import tesserocr
+        self.PSM = tesserocr.PSM
+        kwargs = {"lang": lang, "oem": tesserocr.OEM.LSTM_ONLY, "psm": tesserocr.PSM.SINGLE_LINE}
+        if tessdata:
+            kwargs["path"] = tessdata
+        self.handles = queue.Queue()
+        self.all_handles = []
+        for _ in range(pool_size):
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            self.handles.put(api)
+            self.all_handles.append(api)
+        self.pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="tesserocr")
+
+    def read_crop(self, item):
+        box, crop = item
+        crop = np.ascontiguousarray(crop)
+        height, width = crop.shape
+        psm = self.PSM.SINGLE_WORD if width < self.WORD_ASPECT * height else self.PSM.SINGLE_LINE
+        api = self.handles.get()
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImageBytes(crop.tobytes(), width, height, 1, width)
+            text = api.GetUTF8Text().strip()
+            confs = [c for c in api.AllWordConfidences() if c >= 0]
+        finally:
+            api.Clear()
+            self.handles.put(api)
+        conf = sum(confs) / (100 * len(confs)) if confs else 0.0
+        return (box, ' '.join(text.split()), conf)
+
+    def recognize(self, image_list, batch_size=1):
+        if len(image_list) == 1:
+            return [self.read_crop(image_list[0])]
+        return list(self.pool.map(self.read_crop, image_list))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        for api in self.all_handles:
+            api.End()
+
+class RemoteBackend(OCRBackend):
+    """OCR on a worker machine running remote_ocr.py, with a local backend as fallback.
+
+    Frames and crops go over as JPEG. Recognition is split into batch-sized
+    requests that are all sent before the first answer is read, so the worker
+    never waits on the network between batches. When the worker is unreachable
+    or misses the latency budget, the call is finished on the fallback backend
+    (built on first use) and the worker is left alone for retry_seconds.
+    """
+    name = "remote"
+    supports_batch = True
+
+    def __init__(self, host, port=8485, latency_budget=0.5, fallback="easyocr", fallback_options=None,
+                 retry_seconds=10.0, jpeg_quality=90):
+        from remote_ocr import RemoteClient
+        self.client = RemoteClient(host, port)
+        self.latency_budget = latency_budget
+        self.fallback_name = fallback
+        self.fallback_options = fallback_options
+        self.fallback = None
+        self.retry_seconds = retry_seconds
+        self.jpeg_quality = jpeg_quality
+        self.down_until = 0.0
+        self.remote_calls = 0
+        self.local_calls = 0
+
+    @classmethod
+    def available(cls, host=None):
+        return bool(host)
+
+    def call_remote(self, requests):
+        """Answers to (kind, meta, blobs) requests in order, or None to fall back"""
+        if time.time() < self.down_until:
+            return None
+        from remote_ocr import encode_image
+        try:
+            deadline = time.time() + self.latency_budget
+            ids = [self.client.send(kind, meta, [encode_image(image, self.jpeg_quality) for image in images])
+                   for kind, meta, images in requests]
+            answers = self.client.collect(set(ids), deadline)
+        except (OSError, ValueError) as e:  # includes timeouts and refused connections
+            logging.warning(f"Remote OCR at {self.client.host}:{self.client.port} failed ({e}); "
+                            f"using {self.fallback_name} locally for {self.retry_seconds:.0f}s")
+            self.client.close()
+            self.down_until = time.time() + self.retry_seconds
+            return None
+        self.remote_calls += 1
+        return [answers[i][0] for i in ids]
+
+    def local(self):
+        self.local_calls += 1
+        if self.fallback is None:
+            if self.fallback_name is None:
+                raise RuntimeError("remote OCR worker unavailable and no fallback backend configured")
+            self.fallback = create_backend(self.fallback_name, self.fallback_options)
+        return self.fallback
+
+    def detect(self, image):
+        from rectify import crop_boxes
+        return crop_boxes(image, self.detect_boxes(image), RECOGNIZER_HEIGHT)
+
+    def detect_boxes(self, image):
+        from remote_ocr import DETECT
+        answers = self.call_remote([(DETECT, {}, [image])])
+        if answers is None:
+            return self.local().detect_boxes(image)
+        return answers[0]["boxes"]
+
+    def recognize(self, image_list, batch_size=1):
+        from remote_ocr import RECOGNIZE
+        chunks = [image_list[i:i + batch_size] for i in range(0, len(image_list), max(1, batch_size))]
+        answers = self.call_remote([(RECOGNIZE, {}, [crop for _, crop in chunk]) for chunk in chunks])
+        if answers is None:
+            return self.local().recognize(image_list, batch_size)
+        results = []
+        for chunk, answer in zip(chunks, answers):
+            results.extend((box, text, conf) for (box, _), text, conf
+                           in zip(chunk, answer["texts"], answer["confs"]))
+        return results
+
+    def stats(self):
+        return f"Remote OCR: {self.remote_calls} remote | {self.local_calls} local fallback calls"
+
+    def close(self):
+        self.client.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+BACKENDS = {cls.name: cls for cls in (EasyOCRBackend, OnnxBackend, TesseractBackend, TesserocrBackend,
+                                      RemoteBackend)}
+
+def create_backend(name, options=None):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {name} (choose from {', '.join(BACKENDS)})")
+    start = time.time()
+    backend = BACKENDS[name](**(options or {}))
+    logging.info(f"Loaded {name} OCR backend in {time.time() - start:.1f}s")
+    return backend
+
+def available_backends(backend_options=None):
+    backend_options = backend_options or {}
+    names = []
+    for name, cls in BACKENDS.items():
+        if cls is OnnxBackend:
+            ok = cls.available(backend_options.get(name, {}).get("model_dir"))
+        elif cls is RemoteBackend:
+            ok = cls.available(backend_options.get(name, {}).get("host"))
+        else:
+            ok = cls.available()
+        if ok:
+            names.append(name)
+    return names
+
+def load_samples(sample_dir):
+    """Sample frames listed in labels.csv as: image,KEYWORD [KEYWORD ...]"""
+    samples = []
+    with open(os.path.join(sample_dir, "labels.csv"), newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#") or row[0] == "image":
+                continue
+            frame = cv2.imread(os.path.join(sample_dir, row[0]))
+            if frame is None:
+                logging.warning(f"Could not read sample {row[0]}, skipping")
+                continue
+            keywords = set(row[1].upper().split()) if len(row) > 1 else set()
+            samples.append((row[0], frame, keywords))
+    return samples
+
+def find_keywords(results, keywords, confidence_threshold):
+    found = set()
+    for _, text, conf in results:
+        if conf >= confidence_threshold:
+            clean_text = text.upper().strip()
+            found.update(k for k in keywords if k in clean_text)
+    return found
+
+def benchmark_backend(backend, samples, extract, keywords, confidence_threshold, batch_size):
+    """extract(backend, frame) gives the (box, crop) pairs to recognize, as the monitor would;
+    its time (preprocessing, detection, cropping) is reported as detect_ms"""
+    backend.warmup()
+    detect_time = recognize_time = 0.0
+    hits = expected = false_hits = 0
+    for _, frame, labels in samples:
+        t0 = time.time()
+        image_list = extract(backend, frame)
+        t1 = time.time()
+        results = backend.recognize(image_list, batch_size) if image_list else []
+        t2 = time.time()
+        detect_time += t1 - t0
+        recognize_time += t2 - t1
+
+        found = find_keywords(results, keywords, confidence_threshold)
+        hits += len(found & labels)
+        expected += len(labels)
+        false_hits += len(found - labels)
+
+    n = len(samples)
+    return {
+        "backend": backend.name,
+        "detect_ms": round(1000 * detect_time / n, 1),
+        "recognize_ms": round(1000 * recognize_time / n, 1),
+        "frame_ms": round(1000 * (detect_time + recognize_time) / n, 1),
+        "recall": round(hits / expected, 3) if expected else 1.0,
+        "false_hits": false_hits,
+    }
+
+def benchmark_backends(names, samples, extract, keywords, confidence_threshold, batch_size,
+                       recall_floor, backend_options=None):
+    """Time each backend on the samples; returns (rows, fastest name meeting the recall floor)"""
+    backend_options = backend_options or {}
+    rows = []
+    for name in names:
+        try:
+            start = time.time()
+            backend = create_backend(name, backend_options.get(name))
+            load_s = time.time() - start
+            row = benchmark_backend(backend, samples, extract, keywords, confidence_threshold, batch_size)
+            row["load_s"] = round(load_s, 2)
+            rows.append(row)
+            backend.close()
+        except Exception as e:
+            logging.error(f"Benchmark of {name} failed: {e}")
+    eligible = [row for row in rows if row["recall"] >= recall_floor]
+    best = min(eligible, key=lambda row: row["frame_ms"])["backend"] if eligible else None
+    return rows, best
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Recognition cache keyed by a perceptual hash of the text crop.
+# The same few signs are read thousands of times per run; a crop that looks
+# like one already recognised reuses its text and confidence instead of going
+# through the recognizer again.
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+HASH_SIZE = (32, 8)   # average-hash grid (columns, rows) -> 256-bit hash
+MAX_HAMMING = 20      # bits two hashes may differ by and still count as the same crop
+MAX_ASPECT_DIFF = 0.2  # max |log(aspect)| difference between matching crops
+
+def crop_hash(crop):
+    """Average hash of a normalised crop, plus its aspect ratio"""
+    cols, rows = HASH_SIZE
+    grey = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    # area averaging over each cell smooths sensor noise; thresholding at the
+    # mean makes the hash independent of exposure and contrast
+    small = cv2.resize(grey, (cols, rows), interpolation=cv2.INTER_AREA).astype(np.float32)
+    bits = small > small.mean()
+    return np.packbits(bits).tobytes(), float(np.log(crop.shape[1] / crop.shape[0]))
+
+class RecognitionCache:
+    """LRU of crop hash -> (text, conf) with size and age limits, plus hit metrics"""
+
+    def __init__(self, max_entries=512, ttl=600.0, max_hamming=MAX_HAMMING):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_hamming = max_hamming
+        self.entries = OrderedDict()  # hash bytes -> (aspect, text, conf, stored_at)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, crop):
+        return crop_hash(crop)
+
+    def nearest(self, digest, aspect):
+        if digest in self.entries:
+            return digest
+        if not self.entries or self.max_hamming <= 0:
+            return None
+        keys = list(self.entries)
+        stored = np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(len(keys), -1)
+        query = np.frombuffer(digest, dtype=np.uint8)
+        distances = np.unpackbits(stored ^ query, axis=1).sum(axis=1)
+        for i in np.argsort(distances):
+            if distances[i] > self.max_hamming:
+                break
+            if abs(self.entries[keys[i]][0] - aspect) <= MAX_ASPECT_DIFF:
+                return keys[i]
+        return None
+
+    def get(self, key):
+        """(text, conf) of a matching crop, or None"""
+        digest, aspect = key
+        match = self.nearest(digest, aspect)
+        if match is not None and time.time() - self.entries[match][3] > self.ttl:
+            # expired lazily; anything stale and unmatched ages out through the LRU
+            del self.entries[match]
+            self.expirations += 1
+            match = None
+        if match is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(match)
+        self.hits += 1
+        _, text, conf, _ = self.entries[match]
+        return text, conf
+
+    def put(self, key, text, conf):
+        digest, aspect = key
+        self.entries[digest] = (aspect, text, conf, time.time())
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return (f"Cache: {len(self.entries)} entries | hit rate {100 * self.hit_rate():.1f}% "
+                f"({self.hits}/{self.hits + self.misses}) | {self.evictions} evicted | {self.expirations} expired")
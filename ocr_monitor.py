@@ -3,19 +3,221 @@ import cv2
 import numpy as np
 import os
 import time
-import easyocr
+import argparse
+import csv
 from datetime import datetime
 import logging
 from collections import defaultdict
-import struct
+import threading
+from ocr_backends import BACKENDS, create_backend, available_backends, benchmark_backends, load_samples
+from rectify import crop_boxes, rectify_crops, scale_boxes
+from ocr_cache import RecognitionCache
+from sign_templates import SignTemplateStore, covered
+from ocr_scheduler import MotionScheduler, INTERVALS
+from frame_quality import frame_quality, quality_problem, format_quality
+from preprocess import CHAINS, create_chain, benchmark_chains
+from tiling import TileScheduler, make_tiles, merge_boxes
+from sign_classifier import SignClassifier
+from clip_buffer import ClipBuffer
+from deferred_ocr import DeferredQueue, DeferredWorker, near_misses, system_idle
+from ocr_worker import WorkerProcessBackend, worker_pids
+from live_config import ConfigWatcher, BackgroundBuild, one_of, in_range, positive
+from startup import StartupTimeline, write_ready, clear_ready
+from cameras import Camera, CameraSet, open_source
+from frame_trace import FrameTracer
+import profiler
+from thermal import ThermalSampler, THERMAL_ZONES, CPU_FREQ_PATH, CPU_MAX_FREQ_PATH, THROTTLED_PATH
 
 # Configuration
 PIPE_PATH = "/tmp/frames.pipe"
+FRAME_BROKER_SOCKET = None  # e.g. "/tmp/frames.sock" to share the pipe through frame_broker.py
+# Extra cameras (see cameras.py), each with its own pipe or broker socket and an extrinsic:
+# the 4x4 transform from that camera's frame into the SLAM camera's frame. Detections are
+# tagged with the camera id and logged with that camera's pose in the map.
+EXTRA_CAMERAS = []  # e.g. [{"id": "left", "pipe": "/tmp/frames_left.pipe", "extrinsic": [[0, 0, -1, 0], ...]}]
+OCR_CPU_BUDGET = 0.8  # Fraction of wall-clock time OCR may take, shared fairly between cameras
+READY_PATH = "/tmp/ocr_monitor.ready"  # exists while the pipe is open and the models are warm (see vslam.sh)
 POSE_PATH = "/tmp/latest_pose.txt"
 LOG_DIR = "/home/jay/dev/ORB_SLAM3/Maps/OCR_Logs"
 ERROR_LOG = "/home/jay/dev/ORB_SLAM3/Logs/ocr_errors.log"
 KEYWORDS = ["RECEPTION", "LABORATORY", "PHARMACY", "WARD", "CLINIC"]
 CONFIDENCE_THRESHOLD = 0.80  # Only log OCR results with confidence ≥ 0.80
+COOLDOWN_SECONDS = 30
+
+# Preprocessing chain (see preprocess.CHAINS), or "auto" for the last --benchmark-preprocess pick
+PREPROCESS_CHAIN = "bilateral"
+PREPROCESS_CHOICE_PATH = "/home/jay/dev/ORB_SLAM3/Logs/ocr_preprocess_choice.txt"
+PREPROCESS_RECALL_TOLERANCE = 0.02  # Recall a cheaper chain may give up against the best one
+
+# Batched recognition: text crops from several frames share one recognizer pass
+RECOGNITION_BATCH_SIZE = 16  # Crops per recognizer forward pass
+RECOGNITION_DEADLINE = 0.5   # Max seconds a queued frame waits before its batch is forced
+
+# Two-resolution cascade: CRAFT detection runs on a downscaled frame, boxes are mapped back
+# and recognition runs on crops cut from the full-resolution frame. Logged boxes stay in frame pixels
+DETECTION_SCALE = (0.5, 0.5)  # (x, y) detection input scale; 640x480 -> 320x240
+DETECTION_SIZE = None         # Fixed (width, height) detection input instead, e.g. (320, 240)
+
+# Tile mode for high-resolution input (e.g. 1080p): frames at least TILE_MIN_WIDTH wide are
+# cut into overlapping tiles, a few detected per frame round-robin, boxes merged across seams
+TILE_MODE = True
+TILE_MIN_WIDTH = 1280
+TILE_SIZE = (640, 480)         # Tile size in preprocessed pixels
+TILE_OVERLAP = 0.2             # Fraction of a tile shared with its neighbour
+TILES_PER_FRAME = 2
+TILE_DETECTION_SCALE = (1.0, 1.0)  # Detection scale inside a tile; keeps the reach tiles are for
+
+# Sign-present gate: HOG + linear classifier trained by code/train_sign_classifier.py.
+# Every fresh frame is scored before the scheduler decides: a flagged frame gets OCR on the
+# regions it flagged without waiting for the scheduler (still within OCR_CPU_BUDGET); other
+# frames get whole-frame OCR only when the scheduler asks for one, or none without a scheduler.
+# Off until the model file exists
+SIGN_CLASSIFIER_PATH = "/home/jay/dev/ORB_SLAM3/Models/sign_classifier.npz"
+
+# Clip buffer: recent frames are kept JPEG-compressed in a byte-capped ring; a new detection
+# writes the frames around it to LOG_DIR/ocr_<timestamp>.avi next to its snapshot
+CLIPS_ENABLED = True
+CLIP_BUFFER_BYTES = 32 * 1024 * 1024
+CLIP_PRE_SECONDS = 3.0
+CLIP_POST_SECONDS = 3.0
+CLIP_FPS = 10.0          # Frames buffered per second (each costs one JPEG encode)
+
+# Deferred OCR: frames that nearly read a keyword are spilled to DEFERRED_DIR and re-read
+# with a slow full-resolution pass (deferred_ocr.py) while the robot is parked and the CPU idle
+DEFERRED_ENABLED = True
+DEFERRED_DIR = "/home/jay/dev/ORB_SLAM3/Maps/OCR_Logs/deferred"
+DEFERRED_MIN_CONFIDENCE = 0.3   # Reads below this are noise, not near misses
+DEFERRED_MAX_ITEMS = 500        # Oldest candidates are dropped beyond this
+DEFERRED_BACKEND = "easyocr"
+IDLE_MAX_LOAD = 0.5             # 1-minute load average per core
+IDLE_PARKED_SECONDS = 20        # Motors stopped at least this long
+
+# Rectification: warp each detected text quad to a fronto-parallel strip of fixed height,
+# which keeps oblique signs readable; without it crops are cut axis-aligned
+RECTIFY_CROPS = True
+RECTIFIED_HEIGHT = 64   # Crop height fed to the recognizer
+
+# Recognition cache: crops that hash like an earlier read skip the recognizer
+CACHE_ENABLED = True
+CACHE_SIZE = 512             # Entries kept (LRU)
+CACHE_TTL = 600              # Seconds before a cached read must be confirmed again
+CACHE_MIN_CONFIDENCE = 0.5   # Reads below this are not cached
+
+# Sign templates: keyword signs read with high confidence are remembered as ORB features,
+# so later sightings are identified by feature matching instead of OCR
+TEMPLATES_ENABLED = True
+TEMPLATE_MIN_CONFIDENCE = 0.90  # Reads at or above this become templates
+TEMPLATE_RECHECK_FRAMES = 5     # While known signs are in view, run detection only every Nth frame
+
+# Motion-aware scheduling (see ocr_scheduler.py): OCR rate follows the motor command
+# published by flask_motor.py and the pose deltas
+SCHEDULER_ENABLED = True
+
+# Thermal throttling (see thermal.py): above THERMAL_SOFT_LIMIT the OCR rate drops, down to
+# MIN_OCR_DUTY of normal at THERMAL_HARD_LIMIT or when the firmware reports throttling,
+# so SLAM keeps its cycles. Works through the scheduler even with SCHEDULER_ENABLED off.
+THERMAL_ENABLED = True
+THERMAL_ZONE_GLOB = THERMAL_ZONES
+THERMAL_FREQ_PATH = CPU_FREQ_PATH
+THERMAL_MAX_FREQ_PATH = CPU_MAX_FREQ_PATH
+THERMAL_THROTTLED_PATH = THROTTLED_PATH
+THERMAL_SOFT_LIMIT = 70.0   # °C
+THERMAL_HARD_LIMIT = 80.0   # °C
+MIN_OCR_DUTY = 0.1
+
+# Latency tracing (see frame_trace.py): every frame given to OCR is traced from capture (if the
+# pipe writer stamps frames) or pipe read to the detection log write, into a Chrome trace file
+# LOG_DIR/trace_<timestamp>.json; summarise one with `python frame_trace.py <file>`
+TRACE_ENABLED = False
+# Sampling profiler (see profiler.py): `pkill -USR1 -f ocr_monitor.py` profiles the running monitor
+# for a while (-USR2 adds allocations), or set PROFILE_SECONDS to profile from startup. OCR worker
+# processes get the same signals and write their own ocr_worker_<backend>_<timestamp> profiles
+PROFILE_DIR = "/home/jay/dev/ORB_SLAM3/Logs/profiles"
+
+# Quality gate: blurred or badly exposed frames are dropped before process_image().
+# Scores are measured on a 160 px wide luma image and logged with every detection
+QUALITY_GATE_ENABLED = True
+MIN_SHARPNESS = 40.0        # Laplacian variance
+MEAN_RANGE = (35, 220)      # Acceptable mean level
+MAX_CLIPPED = 0.30          # Max fraction of crushed + blown pixels
+
+# OCR backend (see ocr_backends.py): "easyocr" (PyTorch), "onnx" (int8 ONNX Runtime,
+# export with code/export_onnx.py), "tesserocr" (persistent Tesseract handles), "tesseract"
+# (pytesseract, one subprocess per crop), "remote" (a remote_ocr.py worker on another
+# machine, falling back to REMOTE_FALLBACK locally), or "auto" for the last --benchmark pick
+OCR_BACKEND = "easyocr"
+ONNX_MODEL_DIR = "/home/jay/dev/ORB_SLAM3/Models/easyocr_onnx"
+ONNX_THREADS = 0  # 0 lets ONNX Runtime use every core
+REMOTE_OCR_HOST = None          # e.g. "192.168.1.20"; None leaves the remote backend out of --benchmark
+REMOTE_OCR_PORT = 8485
+REMOTE_LATENCY_BUDGET = 0.5     # Seconds a call may take before it is redone locally
+REMOTE_RETRY_SECONDS = 10.0     # How long to stay local after the worker fails
+REMOTE_FALLBACK = "easyocr"
+
+def backend_options():
+    """Constructor options per backend from the settings above (rebuilt when they are reloaded)"""
+    options = {
+        "onnx": {"model_dir": ONNX_MODEL_DIR, "threads": ONNX_THREADS},
+        "tesseract": {"tesseract_cmd": "/usr/bin/tesseract"},
+        "tesserocr": {"pool_size": 2},  # one API handle per core given to OCR
+    }
+    options["remote"] = {"host": REMOTE_OCR_HOST, "port": REMOTE_OCR_PORT,
+                         "latency_budget": REMOTE_LATENCY_BUDGET, "retry_seconds": REMOTE_RETRY_SECONDS,
+                         "fallback": REMOTE_FALLBACK, "fallback_options": options.get(REMOTE_FALLBACK)}
+    return options
+
+BACKEND_OPTIONS = backend_options()
+# Settings each backend is built from; changing one reloads only a backend that uses it
+BACKEND_SETTINGS = {
+    "onnx": ("ONNX_MODEL_DIR", "ONNX_THREADS"),
+    "remote": ("REMOTE_OCR_HOST", "REMOTE_OCR_PORT", "REMOTE_LATENCY_BUDGET", "REMOTE_FALLBACK"),
+}
+
+def backend_settings(name):
+    settings = BACKEND_SETTINGS.get(name, ())
+    if name == "remote":
+        settings += BACKEND_SETTINGS.get(REMOTE_FALLBACK, ())  # the local fallback is built with it
+    return settings
+
+# Run the backend in a child process that is replaced (warm, between frames) once it
+# grows past WORKER_MAX_RSS_MB or has read WORKER_MAX_FRAMES frames. Both children
+# hold a model during the swap, so leave room for two on a 4 GB Pi.
+WORKER_PROCESS_ENABLED = True
+WORKER_MAX_RSS_MB = 1500
+WORKER_MAX_FRAMES = 20000
+BACKEND_CHOICE_PATH = "/home/jay/dev/ORB_SLAM3/Logs/ocr_backend_choice.txt"
+BENCHMARK_RECALL_FLOOR = 0.8  # Keyword recall a backend needs before speed counts
+
+# Live overrides: CONFIG_PATH holds JSON like {"KEYWORDS": ["WARD"], "CONFIDENCE_THRESHOLD": 0.85}
+# and is re-read between frames when it changes. Only MODEL_SETTINGS rebuild the OCR backend,
+# in the background, swapping it in once loaded; deleting the file restores the values above.
+CONFIG_PATH = "/home/jay/dev/ORB_SLAM3/Logs/ocr_config.json"
+CONFIG_POLL_SECONDS = 2.0
+MODEL_SETTINGS = ("OCR_BACKEND", "ONNX_MODEL_DIR", "ONNX_THREADS", "REMOTE_OCR_HOST", "REMOTE_OCR_PORT",
+                  "REMOTE_LATENCY_BUDGET", "REMOTE_FALLBACK")
+RELOADABLE_SETTINGS = ("KEYWORDS", "CONFIDENCE_THRESHOLD", "COOLDOWN_SECONDS", "PREPROCESS_CHAIN",
+                       "QUALITY_GATE_ENABLED", "MIN_SHARPNESS", "MEAN_RANGE", "MAX_CLIPPED",
+                       "TEMPLATE_MIN_CONFIDENCE", "TEMPLATE_RECHECK_FRAMES", "RECTIFY_CROPS",
+                       "DEFERRED_MIN_CONFIDENCE") + MODEL_SETTINGS
+# Reloaded values outside these reject the whole file
+SETTING_CHECKS = {
+    "CONFIDENCE_THRESHOLD": in_range(0.0, 1.0),
+    "TEMPLATE_MIN_CONFIDENCE": in_range(0.0, 1.0),
+    "DEFERRED_MIN_CONFIDENCE": in_range(0.0, 1.0),
+    "MAX_CLIPPED": in_range(0.0, 1.0),
+    "MEAN_RANGE": in_range(0, 255),
+    "MIN_SHARPNESS": in_range(0.0),
+    "COOLDOWN_SECONDS": in_range(0),
+    "TEMPLATE_RECHECK_FRAMES": positive,
+    "PREPROCESS_CHAIN": one_of(list(CHAINS) + ["auto"]),
+    "OCR_BACKEND": one_of(list(BACKENDS) + ["auto"]),
+    "REMOTE_FALLBACK": one_of([name for name in BACKENDS if name != "remote"]),
+    "ONNX_THREADS": in_range(0),
+    "REMOTE_OCR_PORT": in_range(1, 65535),
+    "REMOTE_LATENCY_BUDGET": positive,
+}
+
+log_lock = threading.Lock()  # the deferred OCR thread appends to the same detection log
 
 def setup_logging():
     os.makedirs(LOG_DIR, exist_ok=True)
@@ -29,10 +231,10 @@ def setup_logging():
         ]
     )
 
-def process_image(frame):
+def process_image(frame, chain):
     try:
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        processed = cv2.bilateralFilter(gray, 11, 17, 17)
+        processed = chain(gray)
         return processed
     except Exception as e:
         logging.error(f"Image processing failed: {e}")
@@ -46,139 +248,661 @@ def read_pose():
         logging.warning(f"Failed to read pose: {e}")
         return "unknown"
 
-def read_exact(fd, size):
-    data = bytearray()
-    while len(data) < size:
-        try:
-            chunk = os.read(fd, size - len(data))
-            if not chunk:
-                return None
-            data.extend(chunk)
-        except BlockingIOError:
-            time.sleep(0.005)
-    return data
-
-def main():
+def camera_configs():
+    """The SLAM camera (through the broker when FRAME_BROKER_SOCKET is set) followed by EXTRA_CAMERAS"""
+    primary = {"id": "slam", "broker": FRAME_BROKER_SOCKET} if FRAME_BROKER_SOCKET else {"id": "slam", "pipe": PIPE_PATH}
+    return [primary] + list(EXTRA_CAMERAS)
+
+def open_cameras(configs):
+    cameras = []
+    for i, config in enumerate(configs):
+        if i > 0 and not os.path.exists(config.get("broker") or config["pipe"]):
+            logging.warning(f"Camera {config['id']}: {config.get('broker') or config['pipe']} not found, skipping it")
+            continue
+        cameras.append(Camera(config["id"], open_source(config), config.get("extrinsic")))
+        logging.info(f"Camera {config['id']}: {config.get('broker') or config['pipe']}")
+    return CameraSet(cameras, OCR_CPU_BUDGET)
+
+def detection_scale(shape):
+    if DETECTION_SIZE is not None:
+        return DETECTION_SIZE[0] / shape[1], DETECTION_SIZE[1] / shape[0]
+    return DETECTION_SCALE
+
+def detect_text_boxes(backend, image, scale_x, scale_y):
+    """Detector boxes for `image`, detected at the given scale, in `image` pixels"""
+    detect_image = image
+    if (scale_x, scale_y) != (1.0, 1.0):
+        detect_image = cv2.resize(image, None, fx=scale_x, fy=scale_y, interpolation=cv2.INTER_AREA)
+    return scale_boxes(backend.detect_boxes(detect_image), image.shape[1] / detect_image.shape[1],
+                       image.shape[0] / detect_image.shape[0])
+
+def extract_text_crops(backend, processed, scale=1.0, full=None, tiles=None):
+    """(box, crop) pairs with boxes in frame pixels.
+
+    scale is the size of `processed` relative to the frame; when the
+    preprocessing chain shrank it, `full` (chain.full_resolution() of the grey
+    frame) is where the recognition crops are cut from. With `tiles`, only those
+    regions of `processed` are detected.
+    """
+    source = processed if full is None else full
+    if tiles:
+        boxes = []
+        for x0, y0, x1, y1 in tiles:
+            tile_boxes = detect_text_boxes(backend, processed[y0:y1, x0:x1], *TILE_DETECTION_SCALE)
+            boxes.extend((np.asarray(box) + (x0, y0)).tolist() for box in tile_boxes)
+        boxes = merge_boxes(boxes)
+    else:
+        boxes = detect_text_boxes(backend, processed, *detection_scale(processed.shape))
+    if source is not processed:
+        boxes = scale_boxes(boxes, source.shape[1] / processed.shape[1], source.shape[0] / processed.shape[0])
+    crop = rectify_crops if RECTIFY_CROPS else crop_boxes
+    image_list = crop(source, boxes, RECTIFIED_HEIGHT)
+    if full is None and scale != 1.0:
+        image_list = [(np.round(scale_boxes([box], 1.0 / scale)[0]).astype(int).tolist(), strip)
+                      for box, strip in image_list]
+    return image_list
+
+def benchmark_tiles(processed):
+    """Every tile of a frame large enough for tile mode (the loop spreads them over frames)"""
+    if TILE_MODE and processed.shape[1] >= TILE_MIN_WIDTH:
+        return make_tiles(processed.shape, TILE_SIZE, TILE_OVERLAP)
+    return None
+
+def benchmark_crops(backend, frame, chain):
+    """The (box, crop) pairs the monitor loop would recognize for one frame"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    processed = chain(gray)
+    return extract_text_crops(backend, processed, chain.scale, chain.full_resolution(gray), benchmark_tiles(processed))
+
+class RecognitionQueue:
+    """Text crops from several frames waiting for one batched recognizer pass"""
+
+    def __init__(self, batch_size, deadline, cache=None):
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.cache = cache
+        self.frames = []   # (frame, pose, results, known count, quality, camera, trace) with cache hits filled in
+        self.crops = []    # crops that still need the recognizer
+        self.pending = []  # (frame index, result index, cache key) per queued crop
+        self.opened_at = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def add(self, frame, pose, image_list, known=(), quality=None, camera=None, trace=None):
+        if not self.frames:
+            self.opened_at = time.time()
+        # signs already identified by template matching go straight into the results
+        results = list(known) + [None] * len(image_list)
+        for i, (box, crop) in enumerate(image_list, len(known)):
+            key = None
+            if self.cache is not None:
+                key = self.cache.key(crop)
+                hit = self.cache.get(key)
+                if hit is not None:
+                    results[i] = (box, hit[0], hit[1])
+                    continue
+            self.pending.append((len(self.frames), i, key))
+            self.crops.append((box, crop))
+        self.frames.append((frame, pose, results, len(known), quality, camera, trace))
+
+    def time_left(self):
+        if not self.frames:
+            return None
+        return self.opened_at + self.deadline - time.time()
+
+    def due(self):
+        # frames answered entirely from the cache don't need to wait
+        if self.frames and not self.crops:
+            return True
+        return len(self.crops) >= self.batch_size or (self.frames and self.time_left() <= 0)
+
+    def flush(self, backend):
+        """Recognise every queued crop and fan the results back out per frame"""
+        if self.crops:
+            recognized = backend.recognize(self.crops, self.batch_size)
+            for (frame_idx, result_idx, key), result in zip(self.pending, recognized):
+                self.frames[frame_idx][2][result_idx] = result
+                if key is not None and result[2] >= CACHE_MIN_CONFIDENCE:
+                    self.cache.put(key, result[1], result[2])
+        batches = self.frames
+        self.frames, self.crops, self.pending, self.opened_at = [], [], [], None
+        return batches
+
+def learn_templates(templates, frame, results):
+    grey = None
+    for (bbox, text, conf) in results:
+        if conf < TEMPLATE_MIN_CONFIDENCE:
+            continue
+        clean_text = text.upper().strip()
+        keyword = next((k for k in KEYWORDS if k in clean_text), None)
+        if keyword is None:
+            continue
+        if grey is None:
+            grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if templates.learn(grey, bbox, keyword, text, conf):
+            logging.info(f"New template for {keyword} ({len(templates)} stored)")
+
+def annotate_keywords(frame, results):
+    found_keywords = []
+
+    for (bbox, text, conf) in results:
+        if conf >= CONFIDENCE_THRESHOLD:
+            clean_text = text.upper().strip()
+            for keyword in KEYWORDS:
+                if keyword in clean_text:
+                    found_keywords.append((keyword, bbox, conf))
+
+                    pts = np.array(bbox).astype(int)
+                    cv2.polylines(frame, [pts], isClosed=True, color=(0, 255, 0), thickness=2)
+                    x, y = pts[0]
+                    cv2.putText(frame, f"{clean_text} ({int(conf * 100)}%)", (x, y - 10),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                    break
+    return found_keywords
+
+def write_detections(frame, timestamp, pose, detections, quality=None, note=None, image_name=None, camera=None):
+    image_name = image_name or (f"ocr_{timestamp}_{camera}.jpg" if camera else f"ocr_{timestamp}.jpg")
+    image_path = os.path.join(LOG_DIR, image_name)
+    cv2.imwrite(image_path, frame)
+    logging.info(f"Saved image to: {image_path}")
+
+    log_file = os.path.join(LOG_DIR, f"ocr_detections_{datetime.now().strftime('%Y%m%d')}.txt")
+    with log_lock, open(log_file, 'a') as f:
+        f.write(f"== {timestamp} ==\n")
+        f.write(f"Pose: {pose}\n")
+        if camera is not None:
+            f.write(f"Camera: {camera}\n")
+        if note is not None:
+            f.write(f"{note}\n")
+        if quality is not None:
+            f.write(f"Quality: {format_quality(quality)}\n")
+        for keyword, bbox, conf in detections:
+            f.write(f"Detected: {keyword}\n")
+            f.write(f"  Confidence: {conf:.2f}\n")
+            f.write(f"  BBox: {bbox}\n")
+            f.write(f"Saved Image: {image_name}\n\n")
+        f.write("\n")
+    return image_name
+
+def log_detections(frame, pose, results, last_detection_times, quality=None, camera=None):
+    found_keywords = annotate_keywords(frame, results)
+    if not found_keywords:
+        return None
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    now = time.time()
+    new_keywords = []
+
+    for keyword, bbox, conf in found_keywords:
+        key = (keyword, pose)
+        if now - last_detection_times[key] >= COOLDOWN_SECONDS:
+            new_keywords.append((keyword, bbox, conf))
+            last_detection_times[key] = now
+
+    if not new_keywords:
+        logging.info("All keywords recently seen — skipping.")
+        return None
+
+    image_name = write_detections(frame, timestamp, pose, new_keywords, quality, camera=camera)
+    for keyword, _, _ in new_keywords:
+        logging.info(f"Detected: {keyword}" + (f" ({camera})" if camera else ""))
+    return image_name
+
+def log_deferred_detections(frame, meta, results):
+    """Log what the idle-time pass read, under the frame's original capture time and pose"""
+    found_keywords = annotate_keywords(frame, results)
+    if not found_keywords:
+        logging.info(f"Deferred OCR: nothing confirmed in frame from {meta['timestamp']}")
+        return
+    note = f"Deferred: re-read {datetime.now().strftime('%Y%m%d_%H%M%S')} (near miss on {', '.join(meta['near_misses'])})"
+    write_detections(frame, meta["timestamp"], meta["pose"], found_keywords, note=note,
+                     image_name=f"ocr_{meta['timestamp']}_deferred.jpg")
+    for keyword, _, _ in found_keywords:
+        logging.info(f"Deferred OCR upgraded: {keyword} (captured {meta['timestamp']})")
+
+def resolve_backend(name):
+    if name != "auto":
+        return name
+    try:
+        with open(BACKEND_CHOICE_PATH, 'r') as f:
+            return f.read().strip()
+    except Exception as e:
+        logging.warning(f"No benchmark choice ({e}), using easyocr")
+        return "easyocr"
+
+def open_backend(name):
+    """The named backend, inside a recycled worker process when WORKER_PROCESS_ENABLED"""
+    if WORKER_PROCESS_ENABLED:
+        return WorkerProcessBackend(name, BACKEND_OPTIONS.get(name), WORKER_MAX_RSS_MB, WORKER_MAX_FRAMES,
+                                    profile_dir=PROFILE_DIR)
+    return create_backend(name, BACKEND_OPTIONS.get(name))
+
+def start_backend(name, timeline):
+    """open_backend() plus a warm-up pass, with both on the startup timeline"""
+    backend = open_backend(name)
+    if WORKER_PROCESS_ENABLED:
+        # the worker loaded and warmed up in its own process and reports how long each took
+        now = time.time()
+        timeline.mark(f"{name} loaded", now - backend.worker.warmup_seconds)
+        timeline.mark("warm-up done", now)
+    else:
+        timeline.mark(f"{name} loaded")
+        backend.warmup()
+        timeline.mark("warm-up done")
+    return backend
+
+def apply_settings(changed, backend_name):
+    """Install reloaded settings as this module's constants. Returns the backend to rebuild in
+    place of `backend_name`, or None if the change doesn't affect it"""
+    global BACKEND_OPTIONS
+    logging.info("Config reloaded: " + ", ".join(f"{name}={value!r}" for name, value in sorted(changed.items())))
+    globals().update(changed)
+    if not any(name in MODEL_SETTINGS for name in changed):
+        return None
+    BACKEND_OPTIONS = backend_options()
+    name = resolve_backend(changed.get("OCR_BACKEND", backend_name))
+    if name != backend_name or any(setting in changed for setting in backend_settings(name)):
+        return name
+    return None
+
+def resolve_chain(name):
+    if name != "auto":
+        return name
+    try:
+        with open(PREPROCESS_CHOICE_PATH, 'r') as f:
+            return f.read().strip()
+    except Exception as e:
+        logging.warning(f"No preprocessing benchmark choice ({e}), using bilateral")
+        return "bilateral"
+
+def save_benchmark_rows(rows, prefix):
+    csv_path = os.path.join(LOG_DIR, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    with open(csv_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    logging.info(f"Benchmark saved to: {csv_path}")
+
+def run_benchmark(sample_dir, recall_floor):
+    setup_logging()
+    samples = load_samples(sample_dir)
+    if not samples:
+        logging.error(f"No labelled samples in {sample_dir}")
+        return
+    names = available_backends(BACKEND_OPTIONS)
+    logging.info(f"Benchmarking {', '.join(names)} on {len(samples)} frames (recall floor {recall_floor:.2f})")
+
+    chain = create_chain(resolve_chain(PREPROCESS_CHAIN))
+    rows, best = benchmark_backends(names, samples, lambda backend, frame: benchmark_crops(backend, frame, chain), KEYWORDS,
+                                    CONFIDENCE_THRESHOLD, RECOGNITION_BATCH_SIZE, recall_floor, BACKEND_OPTIONS)
+    for row in rows:
+        logging.info(f"{row['backend']:>9}: load {row['load_s']}s | detect {row['detect_ms']} ms | "
+                     f"recognize {row['recognize_ms']} ms | frame {row['frame_ms']} ms | "
+                     f"recall {row['recall']:.2f} | false hits {row['false_hits']}")
+    if rows:
+        save_benchmark_rows(rows, "ocr_benchmark")
+
+    if best is None:
+        logging.warning("No backend met the recall floor; keeping the previous choice")
+        return
+    with open(BACKEND_CHOICE_PATH, 'w') as f:
+        f.write(best + "\n")
+    logging.info(f"Selected backend: {best} (used when OCR_BACKEND = \"auto\")")
+
+def run_preprocess_benchmark(sample_dir, backend_name):
+    setup_logging()
+    samples = load_samples(sample_dir)
+    if not samples:
+        logging.error(f"No labelled samples in {sample_dir}")
+        return
+    backend_name = resolve_backend(backend_name)
+    backend = create_backend(backend_name, BACKEND_OPTIONS.get(backend_name))
+    backend.warmup()
+    batch_size = RECOGNITION_BATCH_SIZE if backend.supports_batch else 1
+    logging.info(f"Benchmarking {len(CHAINS)} preprocessing chains with {backend_name} on {len(samples)} frames")
+
+    def run_ocr(processed, scale, full):
+        image_list = extract_text_crops(backend, processed, scale, full, benchmark_tiles(processed))
+        return backend.recognize(image_list, batch_size) if image_list else []
+
+    try:
+        rows, best = benchmark_chains(list(CHAINS), samples, run_ocr, KEYWORDS, CONFIDENCE_THRESHOLD,
+                                      PREPROCESS_RECALL_TOLERANCE)
+    finally:
+        backend.close()
+    for row in rows:
+        logging.info(f"{row['chain']:>18}: preprocess {row['preprocess_ms']} ms | OCR {row['ocr_ms']} ms | "
+                     f"frame {row['frame_ms']} ms | recall {row['recall']:.2f} | false hits {row['false_hits']}")
+    if not rows:
+        return
+    save_benchmark_rows(rows, "ocr_preprocess_benchmark")
+    with open(PREPROCESS_CHOICE_PATH, 'w') as f:
+        f.write(best + "\n")
+    logging.info(f"Selected preprocessing: {best} (used when PREPROCESS_CHAIN = \"auto\")")
+
+def main(backend_name=OCR_BACKEND, chain_name=PREPROCESS_CHAIN):
+    timeline = StartupTimeline()
     setup_logging()
     logging.info("OCR Monitor starting...")
+    timeline.mark("imports done")
+    profiler.install("ocr_monitor", PROFILE_DIR, children=worker_pids)
+    clear_ready(READY_PATH)
 
     last_detection_times = defaultdict(lambda: 0)
-    COOLDOWN_SECONDS = 30
 
-    while not os.path.exists(PIPE_PATH):
+    watcher = ConfigWatcher(CONFIG_PATH, {name: globals()[name] for name in RELOADABLE_SETTINGS}, CONFIG_POLL_SECONDS,
+                            SETTING_CHECKS)
+    changed = watcher.poll()
+    if changed:
+        # a config file left from an earlier run wins over the command line
+        apply_settings(changed, backend_name)
+        backend_name = changed.get("OCR_BACKEND", backend_name)
+        chain_name = changed.get("PREPROCESS_CHAIN", chain_name)
+    rebuilds = []  # BackgroundBuilds of the backend, oldest first
+
+    # the models load and warm up while SLAM is still starting and creating the pipe
+    backend_name = resolve_backend(backend_name)
+    loading = BackgroundBuild(lambda: start_backend(backend_name, timeline), backend_name)
+
+    configs = camera_configs()
+    while not os.path.exists(configs[0].get("broker") or configs[0]["pipe"]):
         time.sleep(0.5)
 
     try:
-        pipe_fd = os.open(PIPE_PATH, os.O_RDONLY | os.O_NONBLOCK)
+        cameras = open_cameras(configs)
     except Exception as e:
         logging.error(f"Failed to open pipe: {e}")
         return
+    timeline.mark("pipe open")
+
+    # frames from before the models are ready are stale by then; drain them so SLAM never blocks on the pipe
+    skipped = 0
+    while not loading.done():
+        fresh = cameras.poll(0.1)
+        skipped += len(fresh)
+        if not fresh:
+            time.sleep(0.01)
+    for camera in cameras.cameras:
+        camera.latest = None
+    if loading.error is not None:
+        logging.error(f"Failed to load {backend_name} OCR backend: {loading.error}")
+        cameras.close()
+        return
+    backend = loading.result
+    if skipped:
+        logging.info(f"Skipped {skipped} frames that arrived while the models loaded")
+    multi_camera = len(cameras) > 1
 
     frame_count = 0
     successful_reads = 0
     start_time = time.time()
 
-    reader = easyocr.Reader(['en'], gpu=False)
+    batch_size = RECOGNITION_BATCH_SIZE if backend.supports_batch else 1
+    try:
+        chain = create_chain(resolve_chain(chain_name))
+    except ValueError as e:
+        logging.error(f"{e}; using bilateral")
+        chain = create_chain("bilateral")
+    logging.info(f"Preprocessing: {chain.name}")
+    cache = RecognitionCache(CACHE_SIZE, CACHE_TTL) if CACHE_ENABLED else None
+    queue = RecognitionQueue(batch_size, RECOGNITION_DEADLINE, cache)
+    templates = SignTemplateStore() if TEMPLATES_ENABLED else None
+    if CLIPS_ENABLED:
+        for camera in cameras.cameras:
+            camera.clips = ClipBuffer(LOG_DIR, CLIP_BUFFER_BYTES, CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_FPS)
+    tiler = TileScheduler(TILE_SIZE, TILE_OVERLAP, TILES_PER_FRAME) if TILE_MODE else None
+    classifier = None
+    if os.path.exists(SIGN_CLASSIFIER_PATH):
+        classifier = SignClassifier.load(SIGN_CLASSIFIER_PATH)
+        logging.info(f"Sign classifier loaded from {SIGN_CLASSIFIER_PATH}")
+    thermal = None
+    if THERMAL_ENABLED:
+        thermal = ThermalSampler(THERMAL_ZONE_GLOB, THERMAL_FREQ_PATH, THERMAL_MAX_FREQ_PATH, THERMAL_THROTTLED_PATH,
+                                 THERMAL_SOFT_LIMIT, THERMAL_HARD_LIMIT, MIN_OCR_DUTY)
+    scheduler = None
+    if SCHEDULER_ENABLED:
+        scheduler = MotionScheduler(POSE_PATH, duty=thermal.duty if thermal else None)
+    elif thermal is not None:
+        scheduler = MotionScheduler(POSE_PATH, {mode: 0.0 for mode in INTERVALS}, duty=thermal.duty)
+    dropped = defaultdict(int)
+    ocr_passes = defaultdict(int)  # per camera: frames that reached template matching
+    tracer = None
+    if TRACE_ENABLED:
+        tracer = FrameTracer(os.path.join(LOG_DIR, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+        logging.info(f"Tracing frame latency to {tracer.path}")
     logging.info("Monitoring pipe for raw frames...")
 
+    deferred = deferred_worker = None
+    if DEFERRED_ENABLED:
+        deferred = DeferredQueue(DEFERRED_DIR, DEFERRED_MAX_ITEMS)
+        deferred_worker = DeferredWorker(
+            # in its own worker process like the live backend, and only for the idle window
+            deferred, lambda: open_backend(DEFERRED_BACKEND),
+            log_deferred_detections, lambda: system_idle(IDLE_MAX_LOAD, IDLE_PARKED_SECONDS),
+            RECOGNITION_BATCH_SIZE)
+        deferred_worker.start()
+        logging.info(f"Deferred OCR: {len(deferred)} frames waiting from earlier runs")
+    write_ready(READY_PATH)
+    timeline.mark("ready")
+
+    def handle(batches):
+        recognized = time.time()
+        for queued_frame, pose, results, known_count, quality, camera, trace in batches:
+            # both before boxes are drawn on the frame
+            if templates is not None:
+                # template matches are the templates' own output, not new reads
+                learn_templates(templates, queued_frame, results[known_count:])
+            if deferred is not None:
+                missed = near_misses(results, KEYWORDS, CONFIDENCE_THRESHOLD, DEFERRED_MIN_CONFIDENCE)
+                if missed:
+                    deferred.spill(queued_frame, pose, missed)
+            image_name = log_detections(queued_frame, pose, results, last_detection_times, quality,
+                                        camera.id if multi_camera else None)
+            if image_name and camera.clips is not None:
+                camera.clips.trigger(os.path.splitext(image_name)[0])
+            if trace is not None:
+                trace.mark("recognized", recognized)
+                if image_name:
+                    trace.mark("logged")
+                tracer.finish(trace, "logged" if image_name else "nothing new")
+
+    next_status = 100
     try:
         while True:
-            header = read_exact(pipe_fd, 12)
-            if not header or len(header) != 12:
-                time.sleep(0.01)
-                continue
+            changed = watcher.poll()
+            if changed:
+                # compared with the newest backend asked for, which may still be loading
+                name = apply_settings(changed, rebuilds[-1].key if rebuilds else backend_name)
+                if name is not None:
+                    logging.info(f"Loading {name} OCR backend in the background")
+                    rebuilds.append(BackgroundBuild(lambda name=name: open_backend(name), name))
+                if "PREPROCESS_CHAIN" in changed:
+                    try:
+                        chain = create_chain(resolve_chain(PREPROCESS_CHAIN))
+                        logging.info(f"Preprocessing: {chain.name}")
+                    except ValueError as e:
+                        logging.error(f"{e}; keeping {chain.name}")
+            if rebuilds and rebuilds[0].done():
+                build = rebuilds.pop(0)
+                if build.error is not None:
+                    logging.error(f"Loading {build.key} failed, keeping {backend_name}: {build.error}")
+                elif rebuilds:
+                    threading.Thread(target=build.result.close, daemon=True).start()  # superseded by a later change
+                else:
+                    old_backend, backend, backend_name = backend, build.result, build.key
+                    queue.batch_size = RECOGNITION_BATCH_SIZE if backend.supports_batch else 1
+                    # queued crops are recognized by the new backend; the old one shuts down off the loop
+                    threading.Thread(target=old_backend.close, daemon=True).start()
+                    logging.info(f"Switched OCR backend to {backend_name}")
 
-            rows, cols, type_code = struct.unpack('III', header)
-
-            if type_code == 16:  # CV_8UC3
-                channels = 3
-                dtype = np.uint8
-            else:
-                logging.warning(f"Unsupported frame type: {type_code}")
+            # Don't let a queued batch outlive its deadline while the cameras are quiet
+            if len(queue) and not cameras.readable(queue.time_left()):
+                handle(queue.flush(backend))
                 continue
 
-            frame_size = rows * cols * channels * np.dtype(dtype).itemsize
-            frame_data = read_exact(pipe_fd, frame_size)
-            if not frame_data or len(frame_data) != frame_size:
-                logging.warning("Incomplete raw frame received")
+            fresh = cameras.poll(0.1)
+            if not fresh:
+                # nothing new, or a pipe at EOF: queued batches still go out by their deadline
+                if queue.due():
+                    handle(queue.flush(backend))
+                time.sleep(0.01)
                 continue
+            if frame_count == 0:
+                timeline.mark("first frame")
+                logging.info(timeline.summary())
+            for camera, new_frame in fresh:
+                if camera.clips is not None:
+                    camera.clips.push(new_frame)
 
-            frame = np.frombuffer(frame_data, dtype=dtype).reshape((rows, cols, channels))
+            frame_count += len(fresh)
+            successful_reads += len(fresh)
 
-            frame_count += 1
-            successful_reads += 1
+            if classifier is not None:
+                # score each camera's newest frame before the scheduler decides anything
+                for camera in dict.fromkeys(camera for camera, _ in fresh):
+                    camera.gray = cv2.cvtColor(camera.latest, cv2.COLOR_BGR2GRAY)
+                    camera.sign_regions = classifier.regions(camera.gray)
+                    camera.sign = camera.sign_regions != []
 
-            processed = process_image(frame)
+            # one camera's latest frame per pass: flagged signs first, then whichever has had the
+            # least OCR time; a flagged frame doesn't wait for the scheduler
+            camera = cameras.pick()
+            ocr_start = time.time()
+            ocr_camera = trace = None
+            processed = None
+            quality = None
+            regions = None
+            if camera is not None and (camera.sign or scheduler is None or scheduler.should_run()):
+                if tracer is not None:
+                    trace = tracer.begin(camera.id, *camera.latest_times, start=ocr_start)
+                gray, flagged = camera.gray, camera.sign
+                if flagged:
+                    regions = camera.sign_regions
+                frame = cameras.take(camera)
+                ocr_camera = camera
+                problem = None
+                if QUALITY_GATE_ENABLED:
+                    quality = frame_quality(frame)
+                    problem = quality_problem(quality, MIN_SHARPNESS, MEAN_RANGE, MAX_CLIPPED)
+                if not problem and classifier is not None and not flagged and scheduler is None:
+                    problem = "no sign"
+                if not problem and gray is None and (templates is not None or chain.scale != 1.0):
+                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if problem:
+                    dropped[problem] += 1
+                    if trace is not None:
+                        tracer.finish(trace, problem)
+                else:
+                    processed = process_image(frame, chain)
+                    if processed is None and trace is not None:
+                        tracer.finish(trace, "preprocessing failed")
             if processed is not None:
-                results = reader.readtext(processed, detail=1)
-                found_keywords = []
-
-                for (bbox, text, conf) in results:
-                    if conf >= CONFIDENCE_THRESHOLD:
-                        clean_text = text.upper().strip()
-                        for keyword in KEYWORDS:
-                            if keyword in clean_text:
-                                found_keywords.append((keyword, bbox, conf))
-
-                                pts = np.array(bbox).astype(int)
-                                cv2.polylines(frame, [pts], isClosed=True, color=(0, 255, 0), thickness=2)
-                                x, y = pts[0]
-                                cv2.putText(frame, f"{clean_text} ({int(conf * 100)}%)", (x, y - 10),
-                                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                                break
-
-                if found_keywords:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    pose = read_pose()
-                    now = time.time()
-                    new_keywords = []
-
-                    for keyword, bbox, conf in found_keywords:
-                        key = (keyword, pose)
-                        if now - last_detection_times[key] >= COOLDOWN_SECONDS:
-                            new_keywords.append((keyword, bbox, conf))
-                            last_detection_times[key] = now
-
-                    if not new_keywords:
-                        logging.info("All keywords recently seen — skipping.")
-                        continue
-
-                    image_name = f"ocr_{timestamp}.jpg"
-                    image_path = os.path.join(LOG_DIR, image_name)
-                    cv2.imwrite(image_path, frame)
-                    logging.info(f"Saved image to: {image_path}")
-
-                    log_file = os.path.join(LOG_DIR, f"ocr_detections_{datetime.now().strftime('%Y%m%d')}.txt")
-                    with open(log_file, 'a') as f:
-                        f.write(f"== {timestamp} ==\n")
-                        f.write(f"Pose: {pose}\n")
-                        for keyword, bbox, conf in new_keywords:
-                            f.write(f"Detected: {keyword}\n")
-                            f.write(f"  Confidence: {conf:.2f}\n")
-                            f.write(f"  BBox: {bbox}\n")
-                            f.write(f"Saved Image: {image_name}\n\n")
-                        f.write("\n")
-
-                    for keyword, _, _ in new_keywords:
-                        logging.info(f"Detected: {keyword}")
-
-            if frame_count % 100 == 0:
+                known = templates.match(gray) if templates is not None else []
+                image_list = []
+                # known signs in view: new text is still looked for, just less often
+                ocr_passes[camera.id] += 1
+                if not known or ocr_passes[camera.id] % TEMPLATE_RECHECK_FRAMES == 0:
+                    full = chain.full_resolution(gray)
+                    tiles = None
+                    if regions:
+                        # only where the classifier saw a sign, in preprocessed pixels
+                        tiles = [tuple(int(round(v * chain.scale)) for v in region) for region in regions]
+                    elif tiler is not None and processed.shape[1] >= TILE_MIN_WIDTH:
+                        tiles = tiler.next(processed.shape)
+                    image_list = [item for item in extract_text_crops(backend, processed, chain.scale, full, tiles)
+                                  if not covered(item[0], known)]
+                if trace is not None:
+                    trace.mark("detected")
+                if image_list or known:
+                    queue.add(frame, camera.pose(read_pose()), image_list, known, quality, camera, trace)
+                elif trace is not None:
+                    tracer.finish(trace, "no text")
+
+            if queue.due():
+                handle(queue.flush(backend))
+            if ocr_camera is not None:
+                cameras.charge(ocr_camera, time.time() - ocr_start)
+
+            if frame_count >= next_status:
+                next_status = frame_count + 100
                 elapsed = time.time() - start_time
                 fps = frame_count / elapsed
                 success_rate = 100 * successful_reads / frame_count
-                logging.info(f"Status: {frame_count} frames | {fps:.2f} FPS | Success rate: {success_rate:.1f}%")
+                thermal_status = f" | {thermal.summary()}" if thermal is not None else ""
+                logging.info(f"Status: {frame_count} frames | {fps:.2f} FPS | "
+                             f"Success rate: {success_rate:.1f}%{thermal_status}")
+                if cache is not None:
+                    logging.info(cache.stats())
+                if templates is not None:
+                    logging.info(templates.stats())
+                if scheduler is not None:
+                    logging.info(scheduler.stats())
+                if classifier is not None:
+                    logging.info(classifier.stats())
+                for camera in cameras.cameras:
+                    if camera.clips is not None:
+                        logging.info(camera.clips.stats())
+                if multi_camera:
+                    logging.info(cameras.stats())
+                if tracer is not None:
+                    logging.info(tracer.stats())
+                if hasattr(backend, "stats"):
+                    logging.info(backend.stats())
+                if deferred is not None:
+                    logging.info(f"Deferred OCR: {deferred.spilled} spilled | {deferred_worker.processed} re-read")
+                if QUALITY_GATE_ENABLED or classifier is not None:
+                    logging.info(f"Frame gates: {sum(dropped.values())} dropped "
+                                 f"({', '.join(f'{k} {v}' for k, v in sorted(dropped.items())) or 'none'})")
 
     except KeyboardInterrupt:
         logging.info("Shutting down by user request")
     finally:
-        os.close(pipe_fd)
+        clear_ready(READY_PATH)
+        handle(queue.flush(backend))
+        for camera in cameras.cameras:
+            if camera.clips is not None:
+                camera.clips.close()
+        if deferred_worker is not None:
+            deferred_worker.stop()
+        backend.close()
+        cameras.close()
         elapsed = time.time() - start_time
         fps = frame_count / elapsed
         success_rate = 100 * successful_reads / frame_count
         logging.info(f"Final stats: {frame_count} frames | {fps:.2f} FPS | Success rate: {success_rate:.1f}%")
+        if cache is not None:
+            logging.info(cache.stats())
+        if templates is not None:
+            logging.info(templates.stats())
+        if scheduler is not None:
+            logging.info(scheduler.stats())
+        if thermal is not None:
+            logging.info(thermal.stats())
+        if tracer is not None:
+            logging.info(tracer.stats())
+            tracer.close()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="OCR monitor for the SLAM frame pipe.")
+    parser.add_argument("--backend", default=OCR_BACKEND,
+                        help="OCR backend: easyocr, onnx, tesserocr, tesseract or auto")
+    parser.add_argument("--benchmark", metavar="SAMPLE_DIR",
+                        help="Time every available backend on labelled frames (labels.csv) and save the pick")
+    parser.add_argument("--recall-floor", type=float, default=BENCHMARK_RECALL_FLOOR,
+                        help="Minimum keyword recall for --benchmark to pick a backend")
+    parser.add_argument("--preprocess", default=PREPROCESS_CHAIN,
+                        help=f"Preprocessing chain: {', '.join(CHAINS)} or auto")
+    parser.add_argument("--benchmark-preprocess", metavar="SAMPLE_DIR",
+                        help="Time every preprocessing chain on labelled frames (labels.csv) and save the pick")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.recall_floor)
+    elif args.benchmark_preprocess:
+        run_preprocess_benchmark(args.benchmark_preprocess, args.backend)
+    else:
+        main(args.backend, args.preprocess)
 
 
 # #!/usr/bin/env python3
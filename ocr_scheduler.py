@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Motion-aware OCR scheduling.
+# A stationary robot keeps showing the same view, and a spinning one smears
+# text into blur; the frames worth reading are the sharp ones right after it
+# has translated somewhere new. The motor command published by flask_motor.py
+# and the SLAM pose deltas decide how often a frame is sent to OCR.
+import time
+import numpy as np
+from motor_state import read_motor_state
+
+# Seconds between OCR frames per motion mode (0 = every frame)
+INTERVALS = {
+    "arrived": 0.0,     # just stopped after translating: fresh view, sharp frames
+    "moving": 0.3,
+    "stationary": 3.0,  # nothing new to see
+    "turning": 2.0,     # motion blur
+}
+ARRIVAL_SECONDS = 2.0     # how long "arrived" lasts after translation stops
+TRANSLATION_SPEED = 0.05  # map units/s above which the pose counts as translating
+ROTATION_RATE = 0.5       # rad/s above which the pose counts as spinning
+FULL_RATE_INTERVAL = 0.1  # gap stretched by a duty below 1 in modes that normally read every frame
+
+def read_pose_quietly(path):
+    # polled every frame, so a missing pose is not worth a warning each time
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+def parse_pose(text):
+    """(R, t) from a pose string holding a 4x4 or 3x4 matrix, or None"""
+    try:
+        values = np.array(text.replace('[', ' ').replace(']', ' ').replace(',', ' ').replace(';', ' ').split(), dtype=float)
+    except ValueError:
+        return None
+    if len(values) not in (12, 16):
+        return None
+    matrix = values[:12].reshape(3, 4)
+    return matrix[:, :3], matrix[:, 3]
+
+class MotionScheduler:
+    """Decides per frame whether OCR should run, from motor state and pose deltas"""
+
+    def __init__(self, pose_path, intervals=INTERVALS, arrival_seconds=ARRIVAL_SECONDS,
+                 translation_speed=TRANSLATION_SPEED, rotation_rate=ROTATION_RATE, state_reader=read_motor_state,
+                 duty=None):
+        self.intervals = dict(intervals)
+        self.arrival_seconds = arrival_seconds
+        self.translation_speed = translation_speed
+        self.rotation_rate = rotation_rate
+        self.pose_path = pose_path
+        self.state_reader = state_reader
+        self.duty = duty  # callable giving the fraction of the normal rate allowed (e.g. thermal headroom)
+        self.last_pose = None      # (time, R, t)
+        self.last_translated = None
+        self.last_run = 0.0
+        self.mode = "moving"
+        self.frames = {mode: 0 for mode in self.intervals}
+        self.runs = {mode: 0 for mode in self.intervals}
+
+    def pose_motion(self, pose_text, now):
+        """(translation speed, rotation rate) since the previous pose, or None"""
+        pose = parse_pose(pose_text)
+        if pose is None:
+            return None
+        previous, self.last_pose = self.last_pose, (now, *pose)
+        if previous is None or now - previous[0] <= 0:
+            return None
+        dt = now - previous[0]
+        # camera centre in the map frame: c = -R^T t
+        distance = np.linalg.norm(-pose[0].T @ pose[1] + previous[1].T @ previous[2])
+        cos_angle = (np.trace(previous[1].T @ pose[0]) - 1) / 2
+        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        return distance / dt, angle / dt
+
+    def classify(self, pose_text, now):
+        state = self.state_reader()
+        command = state[0] if state else None
+        motion = self.pose_motion(pose_text, now)
+
+        translating = command in ("forward", "backward")
+        turning = command in ("left", "right")
+        if motion is not None:
+            speed, rate = motion
+            # the pose also catches motion the command doesn't (pushed, coasting, turning on a curve)
+            turning = turning or rate > self.rotation_rate
+            translating = translating or speed > self.translation_speed
+        if turning:
+            return "turning"
+        if translating:
+            self.last_translated = now
+            return "moving"
+        if self.last_translated is not None and now - self.last_translated <= self.arrival_seconds:
+            return "arrived"
+        if command is None and motion is None:
+            return "moving"  # no motion information: fall back to the steady rate
+        return "stationary"
+
+    def should_run(self, now=None):
+        now = time.time() if now is None else now
+        self.mode = self.classify(read_pose_quietly(self.pose_path), now)
+        self.frames[self.mode] += 1
+        interval = self.intervals[self.mode]
+        if self.duty is not None:
+            duty = self.duty()
+            if duty < 1.0:
+                interval = max(interval, FULL_RATE_INTERVAL) / max(duty, 0.01)
+        if now - self.last_run < interval:
+            return False
+        self.last_run = now
+        self.runs[self.mode] += 1
+        return True
+
+    def stats(self):
+        parts = [f"{mode} {self.runs[mode]}/{self.frames[mode]}" for mode in self.intervals if self.frames[mode]]
+        return f"Scheduler: {self.mode} | OCR frames per mode: {', '.join(parts) or 'none'}"
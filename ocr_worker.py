@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# OCR in a supervised child process that is recycled before it bloats.
+# torch + EasyOCR creep up in RSS over hours of frames. The backend here lives
+# in a child that reports its RSS with every answer; past a memory ceiling or a
+# call count, a replacement is started and warmed up alongside it, and the
+# monitor switches over between calls once it is ready, so no frame waits on a
+# model load. The old child is retired in the background.
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+import profiler
+from ocr_backends import BACKENDS, OCRBackend, create_backend
+
+FRAME_METHODS = ("detect", "detect_boxes", "readtext")  # calls that count as one frame
+LIVE_BACKENDS = weakref.WeakSet()  # for worker_pids()
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, not current
+
+def worker_pids():
+    """Pids of every running OCR worker child, replacements included (profiler signals go to these)"""
+    pids = []
+    for backend in list(LIVE_BACKENDS):
+        for worker in (backend.worker, backend.replacement):
+            if worker is not None and worker.process.pid is not None:
+                pids.append(worker.process.pid)
+    return pids
+
+def worker_main(conn, backend_name, options, warmup_shape, profile_dir=profiler.PROFILE_DIR):
+    """Child process: load and warm the backend, then answer (method, args) requests until None"""
+    # the parent forwards SIGUSR1/SIGUSR2; logging is not set up here, so the profiler prints
+    profile = profiler.install(f"ocr_worker_{backend_name}", profile_dir, log=print)
+    try:
+        start = time.time()
+        backend = create_backend(backend_name, options)
+        loaded = time.time()
+        backend.warmup(warmup_shape)
+    except Exception as e:
+        conn.send(("error", repr(e), rss_bytes()))
+        return
+    conn.send(("ready", (loaded - start, time.time() - loaded), rss_bytes()))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, args = request
+        try:
+            conn.send(("ok", getattr(backend, method)(*args), rss_bytes()))
+        except Exception as e:
+            conn.send(("error", repr(e), rss_bytes()))
+    backend.close()
+    profile.stop()  # a worker retired mid-window still leaves its profile
+
+class OCRWorker:
+    """Handle on one child process"""
+
+    def __init__(self, context, backend_name, options, warmup_shape, profile_dir=profiler.PROFILE_DIR):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, name=f"ocr-worker-{backend_name}", daemon=True,
+                                       args=(child_conn, backend_name, options, warmup_shape, profile_dir))
+        self.process.start()
+        child_conn.close()
+        self.started = time.time()
+        self.frames = 0
+        self.rss = 0
+        self.load_seconds = self.warmup_seconds = 0.0
+
+    def ready(self, timeout=0.0):
+        """True once the child has loaded and warmed up; raises if it failed to"""
+        if not self.conn.poll(timeout):
+            return False
+        status, result, self.rss = self.conn.recv()
+        if status != "ready":
+            raise RuntimeError(f"OCR worker failed to start: {result}")
+        self.load_seconds, self.warmup_seconds = result
+        return True
+
+    def call(self, method, *args):
+        self.conn.send((method, args))
+        status, result, self.rss = self.conn.recv()
+        if method in FRAME_METHODS:
+            self.frames += 1
+        if status != "ok":
+            raise RuntimeError(f"OCR worker {method}() failed: {result}")
+        return result
+
+    def retire(self, timeout=10.0):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass  # already gone
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class WorkerProcessBackend(OCRBackend):
+    """Any backend run in a child process that is swapped for a fresh one past max_rss_mb or max_frames"""
+
+    def __init__(self, backend_name, options=None, max_rss_mb=1500, max_frames=20000,
+                 start_timeout=300.0, warmup_shape=(480, 640), profile_dir=profiler.PROFILE_DIR):
+        # spawn, not fork: the parent has camera, clip and deferred-OCR threads running
+        self.context = multiprocessing.get_context("spawn")
+        self.backend_name = backend_name
+        self.options = options
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.max_frames = max_frames
+        self.start_timeout = start_timeout
+        self.warmup_shape = warmup_shape
+        self.profile_dir = profile_dir
+        self.supports_batch = BACKENDS[backend_name].supports_batch
+        self.replacement = None
+        self.recycles = 0
+        self.worker = None
+        LIVE_BACKENDS.add(self)
+        start = time.time()
+        self.worker = self.start_worker()
+        if not self.worker.ready(start_timeout):
+            self.worker.retire(0)
+            raise TimeoutError(f"OCR worker did not load {backend_name} within {start_timeout:.0f}s")
+        logging.info(f"OCR worker {self.worker.process.pid} ready in {time.time() - start:.1f}s "
+                     f"({self.worker.rss / 1e6:.0f} MB)")
+
+    def start_worker(self):
+        return OCRWorker(self.context, self.backend_name, self.options, self.warmup_shape, self.profile_dir)
+
+    def swap_if_ready(self):
+        replacement = self.replacement
+        try:
+            if time.time() - replacement.started > self.start_timeout:
+                raise TimeoutError("replacement did not warm up in time")
+            if not replacement.ready():
+                return
+        except Exception as e:
+            logging.error(f"OCR worker replacement failed ({e}); keeping {self.worker.process.pid}")
+            threading.Thread(target=replacement.retire, args=(0,), daemon=True).start()
+            self.replacement = None
+            self.worker.frames = 0  # try again after another max_frames
+            return
+        old, self.worker, self.replacement = self.worker, replacement, None
+        self.recycles += 1
+        logging.info(f"OCR worker {old.process.pid} ({old.rss / 1e6:.0f} MB, {old.frames} frames) "
+                     f"replaced by {self.worker.process.pid} ({self.worker.rss / 1e6:.0f} MB)")
+        threading.Thread(target=old.retire, daemon=True).start()
+
+    def call(self, method, *args):
+        if self.replacement is not None:
+            self.swap_if_ready()
+        try:
+            result = self.worker.call(method, *args)
+        except (EOFError, OSError) as e:
+            # the child died (OOM killer, segfault); nothing to hand over, so restart in line
+            logging.error(f"OCR worker {self.worker.process.pid} died ({e}); restarting it")
+            self.worker.retire(0)
+            self.worker = self.start_worker()
+            if not self.worker.ready(self.start_timeout):
+                raise TimeoutError("restarted OCR worker did not come up")
+            result = self.worker.call(method, *args)
+        if self.replacement is None and (self.worker.rss > self.max_rss or self.worker.frames >= self.max_frames):
+            reason = f"{self.worker.rss / 1e6:.0f} MB" if self.worker.rss > self.max_rss else f"{self.worker.frames} frames"
+            logging.info(f"OCR worker {self.worker.process.pid} at {reason}; warming up a replacement")
+            self.replacement = self.start_worker()
+        return result
+
+    def detect(self, image):
+        return self.call("detect", image)
+
+    def detect_boxes(self, image):
+        return self.call("detect_boxes", image)
+
+    def recognize(self, image_list, batch_size=1):
+        return self.call("recognize", image_list, batch_size)
+
+    def readtext(self, image, batch_size=1):
+        return self.call("readtext", image, batch_size)
+
+    def warmup(self, shape=(480, 640)):
+        pass  # every child warms up before it is used
+
+    def stats(self):
+        return (f"OCR worker: pid {self.worker.process.pid} | {self.worker.rss / 1e6:.0f} MB | "
+                f"{self.worker.frames} frames | {self.recycles} recycled")
+
+    def close(self):
+        LIVE_BACKENDS.discard(self)
+        if self.replacement is not None:
+            self.replacement.retire(0)
+        self.worker.retire()
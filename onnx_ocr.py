@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# EasyOCR's CRAFT detector and CRNN recognizer run through ONNX Runtime.
+# Models come from code/export_onnx.py. Nothing here imports torch or easyocr,
+# so the monitor starts without loading PyTorch.
+import json
+import math
+import os
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+DETECTOR_FILE = "craft_int8.onnx"
+RECOGNIZER_FILE = "recognizer_int8.onnx"
+CHARSET_FILE = "charset.json"
+
+RECOGNIZER_HEIGHT = 64
+# Same defaults as easyocr.Reader.detect()/recognize()
+CANVAS_SIZE = 2560
+MAG_RATIO = 1.0
+TEXT_THRESHOLD = 0.7
+LOW_TEXT = 0.4
+LINK_THRESHOLD = 0.4
+MIN_SIZE = 20
+SLOPE_THS = 0.1
+YCENTER_THS = 0.5
+HEIGHT_THS = 0.5
+WIDTH_THS = 0.5
+ADD_MARGIN = 0.1
+CONTRAST_THS = 0.1
+ADJUST_CONTRAST = 0.5
+
+def resize_aspect_ratio(img, square_size, mag_ratio=1.0):
+    height, width, channel = img.shape
+    target_size = min(mag_ratio * max(height, width), square_size)
+    ratio = target_size / max(height, width)
+
+    target_h, target_w = int(height * ratio), int(width * ratio)
+    proc = cv2.resize(img, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
+
+    # CRAFT wants both sides padded to a multiple of 32
+    target_h32 = target_h + (-target_h % 32)
+    target_w32 = target_w + (-target_w % 32)
+    resized = np.zeros((target_h32, target_w32, channel), dtype=np.float32)
+    resized[0:target_h, 0:target_w, :] = proc
+    return resized, ratio
+
+def normalize_mean_variance(img, mean=(0.485, 0.456, 0.406), variance=(0.229, 0.224, 0.225)):
+    img = img.astype(np.float32)
+    img -= np.array(mean, dtype=np.float32) * 255.0
+    img /= np.array(variance, dtype=np.float32) * 255.0
+    return img
+
+def get_det_boxes(textmap, linkmap):
+    """Port of easyocr.craft_utils.getDetBoxes_core (poly=False)"""
+    img_h, img_w = textmap.shape
+    _, text_score = cv2.threshold(textmap, LOW_TEXT, 1, 0)
+    _, link_score = cv2.threshold(linkmap, LINK_THRESHOLD, 1, 0)
+    text_score_comb = np.clip(text_score + link_score, 0, 1)
+    n_labels, labels, stats, _ = cv2.connectedComponentsWithStats(text_score_comb.astype(np.uint8), connectivity=4)
+
+    boxes = []
+    for k in range(1, n_labels):
+        size = stats[k, cv2.CC_STAT_AREA]
+        if size < 10:
+            continue
+        if np.max(textmap[labels == k]) < TEXT_THRESHOLD:
+            continue
+
+        segmap = np.zeros(textmap.shape, dtype=np.uint8)
+        segmap[labels == k] = 255
+        segmap[np.logical_and(link_score == 1, text_score == 0)] = 0
+        x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
+        w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
+        niter = int(math.sqrt(size * min(w, h) / (w * h)) * 2)
+        sx, ex = max(0, x - niter), min(img_w, x + w + niter + 1)
+        sy, ey = max(0, y - niter), min(img_h, y + h + niter + 1)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1 + niter, 1 + niter))
+        segmap[sy:ey, sx:ex] = cv2.dilate(segmap[sy:ey, sx:ex], kernel)
+
+        np_contours = np.roll(np.array(np.where(segmap != 0)), 1, axis=0).transpose().reshape(-1, 2)
+        box = cv2.boxPoints(cv2.minAreaRect(np_contours))
+
+        # align diamond-shape
+        w, h = np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[1] - box[2])
+        if abs(1 - max(w, h) / (min(w, h) + 1e-5)) <= 0.1:
+            l, r = min(np_contours[:, 0]), max(np_contours[:, 0])
+            t, b = min(np_contours[:, 1]), max(np_contours[:, 1])
+            box = np.array([[l, t], [r, t], [r, b], [l, b]], dtype=np.float32)
+
+        # clock-wise order starting top-left
+        box = np.roll(box, 4 - box.sum(axis=1).argmin(), 0)
+        boxes.append(box)
+    return boxes
+
+def group_text_box(polys):
+    """Port of easyocr.utils.group_text_box: merge word boxes into lines"""
+    horizontal_list, free_list, combined_list, merged_list = [], [], [], []
+
+    for poly in polys:
+        slope_up = (poly[3] - poly[1]) / np.maximum(10, (poly[2] - poly[0]))
+        slope_down = (poly[5] - poly[7]) / np.maximum(10, (poly[4] - poly[6]))
+        if max(abs(slope_up), abs(slope_down)) < SLOPE_THS:
+            x_max, x_min = max(poly[0::2]), min(poly[0::2])
+            y_max, y_min = max(poly[1::2]), min(poly[1::2])
+            horizontal_list.append([x_min, x_max, y_min, y_max, 0.5 * (y_min + y_max), y_max - y_min])
+        else:
+            height = np.linalg.norm([poly[6] - poly[0], poly[7] - poly[1]])
+            width = np.linalg.norm([poly[2] - poly[0], poly[3] - poly[1]])
+            margin = int(1.44 * ADD_MARGIN * min(width, height))
+            theta13 = abs(np.arctan((poly[1] - poly[5]) / np.maximum(10, (poly[0] - poly[4]))))
+            theta24 = abs(np.arctan((poly[3] - poly[7]) / np.maximum(10, (poly[2] - poly[6]))))
+            free_list.append([
+                [poly[0] - np.cos(theta13) * margin, poly[1] - np.sin(theta13) * margin],
+                [poly[2] + np.cos(theta24) * margin, poly[3] - np.sin(theta24) * margin],
+                [poly[4] + np.cos(theta13) * margin, poly[5] + np.sin(theta13) * margin],
+                [poly[6] - np.cos(theta24) * margin, poly[7] + np.sin(theta24) * margin],
+            ])
+    horizontal_list = sorted(horizontal_list, key=lambda item: item[4])
+
+    # combine boxes on the same text line
+    new_box = []
+    for poly in horizontal_list:
+        if new_box and abs(np.mean(b_ycenter) - poly[4]) < YCENTER_THS * np.mean(b_height):
+            b_height.append(poly[5])
+            b_ycenter.append(poly[4])
+            new_box.append(poly)
+        else:
+            if new_box:
+                combined_list.append(new_box)
+            b_height, b_ycenter, new_box = [poly[5]], [poly[4]], [poly]
+    if new_box:
+        combined_list.append(new_box)
+
+    for boxes in combined_list:
+        if len(boxes) == 1:
+            box = boxes[0]
+            margin = int(ADD_MARGIN * min(box[1] - box[0], box[5]))
+            merged_list.append([box[0] - margin, box[1] + margin, box[2] - margin, box[3] + margin])
+            continue
+
+        merged_box, new_box = [], []
+        for box in sorted(boxes, key=lambda item: item[0]):
+            if new_box and abs(np.mean(b_height) - box[5]) < HEIGHT_THS * np.mean(b_height) \
+                    and (box[0] - x_max) < WIDTH_THS * (box[3] - box[2]):
+                b_height.append(box[5])
+                new_box.append(box)
+            else:
+                if new_box:
+                    merged_box.append(new_box)
+                b_height, new_box = [box[5]], [box]
+            x_max = box[1]
+        if new_box:
+            merged_box.append(new_box)
+
+        for mbox in merged_box:
+            if len(mbox) == 1:
+                box = mbox[0]
+                margin = int(ADD_MARGIN * min(box[1] - box[0], box[5]))
+                merged_list.append([box[0] - margin, box[1] + margin, box[2] - margin, box[3] + margin])
+            else:
+                x_min = min(b[0] for b in mbox)
+                x_max_ = max(b[1] for b in mbox)
+                y_min = min(b[2] for b in mbox)
+                y_max = max(b[3] for b in mbox)
+                margin = int(ADD_MARGIN * min(x_max_ - x_min, y_max - y_min))
+                merged_list.append([x_min - margin, x_max_ + margin, y_min - margin, y_max + margin])
+
+    return merged_list, free_list
+
+def four_point_transform(image, rect):
+    (tl, tr, br, bl) = rect
+    max_width = max(int(np.linalg.norm(br - bl)), int(np.linalg.norm(tr - tl)))
+    max_height = max(int(np.linalg.norm(tr - br)), int(np.linalg.norm(tl - bl)))
+    dst = np.array([[0, 0], [max_width - 1, 0], [max_width - 1, max_height - 1], [0, max_height - 1]], dtype="float32")
+    M = cv2.getPerspectiveTransform(rect, dst)
+    return cv2.warpPerspective(image, M, (max_width, max_height))
+
+def resize_to_height(img, model_height):
+    height, width = img.shape[:2]
+    ratio = width / height
+    if ratio < 1.0:
+        # vertical text: easyocr keeps the long side as width
+        return cv2.resize(img, (model_height, int(model_height / ratio)), interpolation=cv2.INTER_LINEAR)
+    return cv2.resize(img, (int(model_height * ratio), model_height), interpolation=cv2.INTER_LINEAR)
+
+def get_image_list(horizontal_list, free_list, img, model_height=RECOGNIZER_HEIGHT):
+    """Same (box, crop) output as easyocr.utils.get_image_list"""
+    image_list = []
+    maximum_y, maximum_x = img.shape
+
+    for box in free_list:
+        crop = four_point_transform(img, np.array(box, dtype="float32"))
+        if crop.shape[0] == 0 or crop.shape[1] == 0:
+            continue
+        image_list.append((box, resize_to_height(crop, model_height)))
+
+    for box in horizontal_list:
+        x_min, x_max = max(0, box[0]), min(box[1], maximum_x)
+        y_min, y_max = max(0, box[2]), min(box[3], maximum_y)
+        if x_max <= x_min or y_max <= y_min:
+            continue
+        crop = img[y_min:y_max, x_min:x_max]
+        image_list.append(([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+                           resize_to_height(crop, model_height)))
+
+    return sorted(image_list, key=lambda item: item[0][0][1])
+
+def adjust_contrast_grey(img, target=0.4):
+    high, low = np.percentile(img, 90), np.percentile(img, 10)
+    contrast = (high - low) / np.maximum(10, high + low)
+    if contrast < target:
+        ratio = 200. / np.maximum(10, high - low)
+        img = np.clip((img.astype(int) - low + 25) * ratio, 0, 255).astype(np.uint8)
+    return img
+
+def pad_batch(crops, width, adjust_contrast=0.0):
+    """Right-pad crops with their last column, as easyocr's NormalizePAD does"""
+    batch = np.zeros((len(crops), 1, RECOGNIZER_HEIGHT, width), dtype=np.float32)
+    for i, crop in enumerate(crops):
+        if adjust_contrast > 0:
+            crop = adjust_contrast_grey(crop, target=adjust_contrast)
+        w = min(width, math.ceil(RECOGNIZER_HEIGHT * crop.shape[1] / crop.shape[0]))
+        crop = cv2.resize(crop, (w, RECOGNIZER_HEIGHT), interpolation=cv2.INTER_CUBIC)
+        crop = (crop.astype(np.float32) / 255.0 - 0.5) / 0.5
+        batch[i, 0, :, :w] = crop
+        batch[i, 0, :, w:] = crop[:, w - 1:w]
+    return batch
+
+class OnnxReader:
+    """Detect/recognise with the int8 ONNX exports of EasyOCR's English models"""
+
+    def __init__(self, model_dir, threads=0):
+        with open(os.path.join(model_dir, CHARSET_FILE)) as f:
+            charset = json.load(f)
+        self.character = charset["character"]
+        self.lang_char = charset["lang_char"]
+        # Index 0 is the CTC blank; characters outside the language set are masked out
+        self.ignore_idx = [self.character.index(c) + 1 for c in set(self.character) - set(self.lang_char)]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+        self.detector = ort.InferenceSession(os.path.join(model_dir, DETECTOR_FILE), options, providers=providers)
+        self.recognizer = ort.InferenceSession(os.path.join(model_dir, RECOGNIZER_FILE), options, providers=providers)
+        self.detector_input = self.detector.get_inputs()[0].name
+        self.recognizer_input = self.recognizer.get_inputs()[0].name
+
+    def detect(self, image):
+        """Returns ([horizontal_list], [free_list]) like easyocr.Reader.detect()"""
+        img = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB) if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        resized, ratio = resize_aspect_ratio(img, CANVAS_SIZE, MAG_RATIO)
+        x = np.transpose(normalize_mean_variance(resized), (2, 0, 1))[np.newaxis]
+        y = self.detector.run(None, {self.detector_input: x})[0][0]
+
+        # score maps are at half resolution
+        polys = [(box * (2 / ratio)).astype(np.int32).reshape(-1) for box in get_det_boxes(y[:, :, 0], y[:, :, 1])]
+        horizontal_list, free_list = group_text_box(polys)
+        horizontal_list = [b for b in horizontal_list if max(b[1] - b[0], b[3] - b[2]) > MIN_SIZE]
+        free_list = [b for b in free_list
+                     if max(np.ptp([c[0] for c in b]), np.ptp([c[1] for c in b])) > MIN_SIZE]
+        return [horizontal_list], [free_list]
+
+    def predict(self, crops, adjust_contrast=0.0):
+        width = max(math.ceil(c.shape[1] / RECOGNIZER_HEIGHT) for c in crops) * RECOGNIZER_HEIGHT
+        logits = self.recognizer.run(None, {self.recognizer_input: pad_batch(crops, width, adjust_contrast)})[0]
+
+        prob = np.exp(logits - logits.max(axis=2, keepdims=True))
+        prob[:, :, self.ignore_idx] = 0.
+        prob /= prob.sum(axis=2, keepdims=True)
+        indices = prob.argmax(axis=2)
+        values = prob.max(axis=2)
+
+        results = []
+        for index, value in zip(indices, values):
+            # greedy CTC decode: collapse repeats, drop blanks
+            keep = np.insert(index[1:] != index[:-1], 0, True) & (index != 0)
+            text = ''.join(self.character[i - 1] for i in index[keep])
+            max_probs = value[index != 0]
+            conf = max_probs.prod() ** (2.0 / np.sqrt(len(max_probs))) if len(max_probs) else 0.0
+            results.append((text, float(conf)))
+        return results
+
+    def recognize(self, image_list, batch_size):
+        """Batched recognition of (box, crop) pairs; returns (bbox, text, conf)"""
+        order = sorted(range(len(image_list)), key=lambda i: image_list[i][1].shape[1])
+        results = [None] * len(image_list)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            preds = self.predict([image_list[i][1] for i in chunk])
+            # second pass with contrast boost for weak reads, as easyocr does
+            weak = [j for j, (_, conf) in enumerate(preds) if conf < CONTRAST_THS]
+            if weak:
+                retry = self.predict([image_list[chunk[j]][1] for j in weak], ADJUST_CONTRAST)
+                for j, pred in zip(weak, retry):
+                    if pred[1] > preds[j][1]:
+                        preds[j] = pred
+            for i, (text, conf) in zip(chunk, preds):
+                results[i] = (image_list[i][0], text, conf)
+        return results
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Configurable preprocessing between the grey conversion and OCR.
+# A chain is a list of steps such as [("resize", 0.75), ("clahe", 2.0, 8)];
+# named chains are benchmarked on labelled frames for cost and keyword recall
+# so the default comes from data rather than habit.
+import time
+import cv2
+from ocr_backends import find_keywords
+
+def resize_step(scale):
+    return lambda img: cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def gaussian_step(ksize=3):
+    return lambda img: cv2.GaussianBlur(img, (ksize, ksize), 0)
+
+def bilateral_step(d=11, sigma_color=17, sigma_space=17):
+    return lambda img: cv2.bilateralFilter(img, d, sigma_color, sigma_space)
+
+def clahe_step(clip_limit=2.0, tiles=8):
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tiles, tiles))
+    return clahe.apply
+
+def adaptive_threshold_step(block_size=11, c=2):
+    # as in former_codes/tessaract_ocr_monitor.py, but keeping dark text on a light ground
+    return lambda img: cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                             cv2.THRESH_BINARY, block_size, c)
+
+STEPS = {
+    "resize": resize_step,
+    "gaussian": gaussian_step,
+    "bilateral": bilateral_step,
+    "clahe": clahe_step,
+    "adaptive_threshold": adaptive_threshold_step,
+}
+
+# Candidate chains; "bilateral" is the original fixed filter
+CHAINS = {
+    "none": [],
+    "bilateral": [("bilateral", 11, 17, 17)],
+    "bilateral_fast": [("bilateral", 5, 17, 17)],
+    "gaussian": [("gaussian", 3)],
+    "clahe": [("clahe", 2.0, 8)],
+    "gaussian_clahe": [("gaussian", 3), ("clahe", 2.0, 8)],
+    "resize_clahe": [("resize", 0.75), ("clahe", 2.0, 8)],
+    "adaptive_threshold": [("adaptive_threshold", 11, 2)],
+}
+
+class PreprocessChain:
+    """Grey image -> OCR input; `scale` maps OCR coordinates back to the frame.
+
+    A chain that resizes detects on the small image but recognizes crops cut
+    from full_resolution(): the same steps without the resize.
+    """
+
+    def __init__(self, name, steps):
+        self.name = name
+        self.scale = 1.0
+        self.ops = []
+        self.full_ops = []
+        for step in steps:
+            step_name, *args = step
+            if step_name not in STEPS:
+                raise ValueError(f"Unknown preprocessing step: {step_name}")
+            if step_name == "resize":
+                self.scale *= args[0]
+            else:
+                self.full_ops.append(STEPS[step_name](*args))
+            self.ops.append(STEPS[step_name](*args))
+
+    def __call__(self, grey):
+        for op in self.ops:
+            grey = op(grey)
+        return grey
+
+    def full_resolution(self, grey):
+        """Recognition source for a resizing chain, None when the chain keeps full resolution"""
+        if self.scale == 1.0:
+            return None
+        for op in self.full_ops:
+            grey = op(grey)
+        return grey
+
+def create_chain(name, chains=CHAINS):
+    if name not in chains:
+        raise ValueError(f"Unknown preprocessing chain: {name} (choose from {', '.join(chains)})")
+    return PreprocessChain(name, chains[name])
+
+def benchmark_chain(chain, samples, run_ocr, keywords, confidence_threshold):
+    preprocess_time = ocr_time = 0.0
+    hits = expected = false_hits = 0
+    for _, frame, labels in samples:
+        t0 = time.time()
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        processed = chain(grey)
+        full = chain.full_resolution(grey)  # as in ocr_monitor's loop
+        t1 = time.time()
+        results = run_ocr(processed, chain.scale, full)
+        t2 = time.time()
+        preprocess_time += t1 - t0
+        ocr_time += t2 - t1
+
+        found = find_keywords(results, keywords, confidence_threshold)
+        hits += len(found & labels)
+        expected += len(labels)
+        false_hits += len(found - labels)
+
+    n = len(samples)
+    return {
+        "chain": chain.name,
+        "preprocess_ms": round(1000 * preprocess_time / n, 2),
+        "ocr_ms": round(1000 * ocr_time / n, 1),
+        "frame_ms": round(1000 * (preprocess_time + ocr_time) / n, 1),
+        "recall": round(hits / expected, 3) if expected else 1.0,
+        "false_hits": false_hits,
+    }
+
+def benchmark_chains(names, samples, run_ocr, keywords, confidence_threshold, recall_tolerance, chains=CHAINS):
+    """Cost and recall per chain; returns (rows, cheapest chain within tolerance of the best recall)"""
+    rows = [benchmark_chain(create_chain(name, chains), samples, run_ocr, keywords, confidence_threshold)
+            for name in names]
+    if not rows:
+        return rows, None
+    best_recall = max(row["recall"] for row in rows)
+    eligible = [row for row in rows if row["recall"] >= best_recall - recall_tolerance]
+    best = min(eligible, key=lambda row: (row["frame_ms"], row["false_hits"]))["chain"]
+    return rows, best
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Opt-in sampling profiler for the long-running processes (ocr_monitor.py, flask_motor.py).
+# Nothing runs until asked: a signal or PROFILE_SECONDS starts one bounded window
+# in a background thread, which samples every thread's Python stack and writes
+# the counts in the collapsed-stack format flamegraph.pl, speedscope and
+# inferno read. With allocations on, tracemalloc runs for the same window and
+# its snapshot is dumped next to a top-lines summary. The process keeps running.
+#
+#   pkill -USR1 -f ocr_monitor.py          # profile stacks for DEFAULT_SECONDS
+#   pkill -USR2 -f ocr_monitor.py          # stacks + allocation snapshot
+#   PROFILE_SECONDS=60 PROFILE_ALLOC=1 python ocr_monitor.py   # profile the first minute
+#   flamegraph.pl Logs/profiles/ocr_monitor_<ts>.folded > ocr.svg
+#
+# Signals are passed on to the pids install()'s children() returns, so OCR
+# worker processes (see ocr_worker.py) profile the same window into their own
+# ocr_worker_<backend>_<ts> files.
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = "/home/jay/dev/ORB_SLAM3/Logs/profiles"
+DEFAULT_SECONDS = 30.0
+MAX_SECONDS = 300.0
+INTERVAL = 0.01        # seconds between stack samples
+ALLOC_FRAMES = 10      # traceback depth tracemalloc records
+ALLOC_TOP = 30         # lines in the allocation summary
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)})"
+
+class ProfileWindow(threading.Thread):
+    def __init__(self, name, out_dir, seconds, interval, allocations, log):
+        super().__init__(name="profiler", daemon=True)
+        self.prefix = os.path.join(out_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.out_dir = out_dir
+        self.seconds = min(seconds, MAX_SECONDS)
+        self.interval = interval
+        self.allocations = allocations
+        self.log = log
+        self.counts = Counter()  # collapsed stack -> samples
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.counts[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        started_tracing = self.allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(ALLOC_FRAMES)
+        self.log(f"Profiling for {self.seconds:g}s{' with allocations' if self.allocations else ''}")
+        deadline = time.time() + self.seconds
+        while time.time() < deadline and not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+        with open(f"{self.prefix}.folded", 'w') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        self.log(f"Profile: {self.samples} samples, {len(self.counts)} stacks -> {self.prefix}.folded")
+        if self.allocations:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            if started_tracing:
+                tracemalloc.stop()
+            snapshot.dump(f"{self.prefix}.tracemalloc")
+            with open(f"{self.prefix}_alloc.txt", 'w') as f:
+                for stat in snapshot.statistics("lineno")[:ALLOC_TOP]:
+                    f.write(f"{stat}\n")
+            self.log(f"Allocations: top {ALLOC_TOP} lines -> {self.prefix}_alloc.txt")
+
+class Profiler:
+    """Starts at most one profiling window at a time"""
+
+    def __init__(self, name, out_dir=PROFILE_DIR, seconds=DEFAULT_SECONDS, interval=INTERVAL, log=logging.info):
+        self.name = name
+        self.out_dir = out_dir
+        self.seconds = seconds
+        self.interval = interval
+        self.log = log
+        self.window = None
+
+    def start(self, seconds=None, allocations=False):
+        if self.window is not None and self.window.is_alive():
+            return None  # one window at a time; a second signal is ignored
+        self.window = ProfileWindow(self.name, self.out_dir, seconds or self.seconds, self.interval, allocations, self.log)
+        self.window.start()
+        return self.window
+
+    def stop(self):
+        """End a running window early and wait for its files to be written"""
+        if self.window is not None and self.window.is_alive():
+            self.window.stopped.set()
+            self.window.join()
+
+def forward(signum, children):
+    for pid in children():
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass  # exited since it was listed
+
+def install(name, out_dir=PROFILE_DIR, log=logging.info, children=None):
+    """Profile on SIGUSR1 (stacks) or SIGUSR2 (stacks and allocations), and from startup when
+    PROFILE_SECONDS is set (PROFILE_ALLOC=1 adds allocations). Both signals are also sent to
+    the pids children() returns. Call from the main thread."""
+    profiler = Profiler(name, out_dir, log=log)
+
+    def handler(signum, _):
+        # only starts the thread; anything that writes happens on it
+        profiler.start(allocations=signum == signal.SIGUSR2)
+        if children is not None:
+            forward(signum, children)
+    signal.signal(signal.SIGUSR1, handler)
+    signal.signal(signal.SIGUSR2, handler)
+    seconds = os.environ.get("PROFILE_SECONDS")
+    if seconds:
+        profiler.start(float(seconds), allocations=os.environ.get("PROFILE_ALLOC") == "1")
+    return profiler
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Perspective rectification of detected sign text.
+# A sign seen obliquely in a corridor is a trapezoid, not a rectangle: its top
+# and bottom edges converge. Fitting those edges and warping the crop to a
+# fronto-parallel strip of fixed height gives the recognizer a clean input even
+# when detection ran on a downscaled frame.
+import cv2
+import numpy as np
+
+QUAD_MARGIN = 0.25       # search margin around a box, as a fraction of its height
+MIN_TEXT_COLUMNS = 8     # fewer text columns than this: keep the detector's box
+MAX_SIDE_RATIO = 3.0     # reject fits whose left/right heights differ more than this
+STRIP_PADDING = 0.12     # border kept around the text, as a fraction of strip height
+
+def order_quad(points):
+    """Order 4 points as top-left, top-right, bottom-right, bottom-left"""
+    pts = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[s.argmin()], pts[d.argmin()], pts[s.argmax()], pts[d.argmax()]], dtype=np.float32)
+
+def scale_boxes(boxes, scale_x, scale_y=None):
+    scale_y = scale_x if scale_y is None else scale_y
+    return [(np.asarray(box, dtype=np.float32) * (scale_x, scale_y)).tolist() for box in boxes]
+
+def fit_edge(columns, rows):
+    """Robust line fit row = a * column + b through one text envelope"""
+    points = np.column_stack([columns, rows]).astype(np.float32)
+    vx, vy, x0, y0 = cv2.fitLine(points, cv2.DIST_HUBER, 0, 0.01, 0.01).ravel()
+    if abs(vx) < 1e-6:
+        return None
+    slope = vy / vx
+    return slope, y0 - slope * x0
+
+def fit_quad(grey, box):
+    """Fit the text's perspective quadrilateral around a detected box.
+
+    The top and bottom envelopes of the text pixels are fitted as lines and
+    cut by the leftmost/rightmost text columns; sign edges stay vertical for
+    an upright camera. Falls back to the detector's box on a poor fit.
+    """
+    quad = order_quad(box)
+    img_h, img_w = grey.shape
+    box_h = max(np.linalg.norm(quad[3] - quad[0]), np.linalg.norm(quad[2] - quad[1]))
+    margin = int(QUAD_MARGIN * box_h)
+    x0 = max(0, int(quad[:, 0].min()) - margin)
+    x1 = min(img_w, int(np.ceil(quad[:, 0].max())) + margin)
+    y0 = max(0, int(quad[:, 1].min()) - margin)
+    y1 = min(img_h, int(np.ceil(quad[:, 1].max())) + margin)
+    roi = grey[y0:y1, x0:x1]
+    if roi.size == 0:
+        return quad
+
+    _, mask = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if cv2.countNonZero(mask) > mask.size // 2:
+        mask = 255 - mask  # text is the minority class
+    # drop specks that would drag the envelopes
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+    filled = mask > 0
+    columns = np.where(filled.any(axis=0))[0]
+    if len(columns) < MIN_TEXT_COLUMNS:
+        return quad
+    tops = filled[:, columns].argmax(axis=0)
+    bottoms = roi.shape[0] - 1 - filled[::-1, columns].argmax(axis=0)
+
+    top, bottom = fit_edge(columns, tops), fit_edge(columns, bottoms)
+    if top is None or bottom is None:
+        return quad
+    left, right = float(columns[0]), float(columns[-1])
+    fitted = np.array([
+        [left, top[0] * left + top[1]],
+        [right, top[0] * right + top[1]],
+        [right, bottom[0] * right + bottom[1]],
+        [left, bottom[0] * left + bottom[1]],
+    ], dtype=np.float32)
+
+    left_h, right_h = fitted[3, 1] - fitted[0, 1], fitted[2, 1] - fitted[1, 1]
+    if min(left_h, right_h) < 2 or max(left_h, right_h) / min(left_h, right_h) > MAX_SIDE_RATIO:
+        return quad
+    return fitted + (x0, y0)
+
+def rectify(grey, quad, height):
+    """Warp a quadrilateral to a fronto-parallel strip `height` pixels tall"""
+    quad = np.asarray(quad, dtype=np.float32)
+    quad_w = 0.5 * (np.linalg.norm(quad[1] - quad[0]) + np.linalg.norm(quad[2] - quad[3]))
+    quad_h = 0.5 * (np.linalg.norm(quad[3] - quad[0]) + np.linalg.norm(quad[2] - quad[1]))
+    if quad_w < 1 or quad_h < 1:
+        return None
+    pad = int(STRIP_PADDING * height)
+    text_h = height - 2 * pad
+    width = max(1, int(round(text_h * quad_w / quad_h))) + 2 * pad
+    dst = np.array([[pad, pad], [width - 1 - pad, pad], [width - 1 - pad, height - 1 - pad],
+                    [pad, height - 1 - pad]], dtype=np.float32)
+    M = cv2.getPerspectiveTransform(quad, dst)
+    return cv2.warpPerspective(grey, M, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def crop_boxes(grey, boxes, height):
+    """(box, crop) pairs cut axis-aligned and scaled to `height`, like easyocr's get_image_list"""
+    img_h, img_w = grey.shape
+    image_list = []
+    for box in boxes:
+        pts = np.asarray(box, dtype=np.float32)
+        x0, y0 = max(0, int(pts[:, 0].min())), max(0, int(pts[:, 1].min()))
+        x1, y1 = min(img_w, int(np.ceil(pts[:, 0].max()))), min(img_h, int(np.ceil(pts[:, 1].max())))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            continue
+        width = max(1, int(round(height * (x1 - x0) / (y1 - y0))))
+        crop = cv2.resize(grey[y0:y1, x0:x1], (width, height), interpolation=cv2.INTER_LINEAR)
+        image_list.append((pts.round().astype(int).tolist(), crop))
+    return image_list
+
+def rectify_crops(grey, boxes, height):
+    """(box, strip) pairs for OCRBackend.recognize(); boxes become the fitted quads"""
+    image_list = []
+    for box in boxes:
+        quad = fit_quad(grey, box)
+        strip = rectify(grey, quad, height)
+        if strip is not None:
+            image_list.append((quad.round().astype(int).tolist(), strip))
+    return image_list
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# Remote OCR worker and its wire protocol.
+# Run on a stronger machine:  python remote_ocr.py --serve --backend easyocr
+# and set OCR_BACKEND = "remote" on the Pi (see RemoteBackend in ocr_backends.py).
+#
+# Every message is a fixed header (payload length, request id, message type)
+# followed by a length-prefixed JSON part and the JPEG blobs it lists, so no
+# pickle crosses the wire. Requests on one connection are answered in order,
+# which lets the client keep several in flight.
+import argparse
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+import cv2
+import numpy as np
+
+DEFAULT_PORT = 8485
+HEADER = struct.Struct('!IQB')   # payload bytes, request id, message type
+JSON_LENGTH = struct.Struct('!I')
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+DETECT, RECOGNIZE, RESULT, ERROR = 1, 2, 3, 4
+
+def encode_image(image, quality=90):
+    ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return jpeg.tobytes()
+
+def decode_image(blob):
+    image = cv2.imdecode(np.frombuffer(blob, np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError("JPEG decoding failed")
+    return image
+
+def encode_message(kind, request_id, meta, blobs=()):
+    head = json.dumps(dict(meta, sizes=[len(blob) for blob in blobs])).encode()
+    payload = JSON_LENGTH.pack(len(head)) + head + b''.join(blobs)
+    return HEADER.pack(len(payload), request_id, kind) + payload
+
+def recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+def read_message(sock):
+    """(kind, request id, meta, blobs) of the next message on the socket"""
+    size, request_id, kind = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if size > MAX_PAYLOAD:
+        raise ValueError(f"payload of {size} bytes exceeds the limit")
+    payload = recv_exact(sock, size)
+    (head_size,) = JSON_LENGTH.unpack_from(payload)
+    offset = JSON_LENGTH.size + head_size
+    meta = json.loads(payload[JSON_LENGTH.size:offset])
+    blobs = []
+    for blob_size in meta.pop("sizes", []):
+        blobs.append(payload[offset:offset + blob_size])
+        offset += blob_size
+    return kind, request_id, meta, blobs
+
+class RemoteClient:
+    """One connection to a worker; send() queues a request, collect() waits for answers"""
+
+    def __init__(self, host, port=DEFAULT_PORT, connect_timeout=1.0):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.sock = None
+        self.next_id = 1
+
+    def connect(self):
+        if self.sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sock
+
+    def send(self, kind, meta, blobs=()):
+        self.connect()
+        request_id = self.next_id
+        self.next_id += 1
+        self.sock.settimeout(self.connect_timeout)
+        self.sock.sendall(encode_message(kind, request_id, meta, blobs))
+        return request_id
+
+    def collect(self, request_ids, deadline):
+        """{request id: (meta, blobs)} for every request, or raise TimeoutError/ConnectionError"""
+        answers = {}
+        while len(answers) < len(request_ids):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError("remote OCR over its latency budget")
+            self.sock.settimeout(remaining)
+            try:
+                kind, request_id, meta, blobs = read_message(self.sock)
+            except socket.timeout:
+                raise TimeoutError("remote OCR over its latency budget")
+            if kind == ERROR:
+                raise ConnectionError(f"worker error: {meta.get('error')}")
+            if request_id in request_ids:
+                answers[request_id] = (meta, blobs)
+        return answers
+
+    def close(self):
+        # a late answer would be misattributed, so any failure drops the connection
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+class OCRServer:
+    """Serves detect/recognize requests from any number of clients with one backend"""
+
+    def __init__(self, backend, host="0.0.0.0", port=DEFAULT_PORT, batch_size=16):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.lock = threading.Lock()  # backends are not thread-safe
+        self.listener = socket.create_server((host, port), reuse_port=False)
+        self.requests = 0
+
+    def handle(self, kind, meta, blobs):
+        with self.lock:
+            if kind == DETECT:
+                boxes = self.backend.detect_boxes(decode_image(blobs[0]))
+                return {"boxes": np.asarray(boxes, dtype=float).round(1).tolist() if boxes else []}
+            if kind == RECOGNIZE:
+                # the client keeps the boxes; crops are matched back to them by position
+                image_list = [(i, decode_image(blob)) for i, blob in enumerate(blobs)]
+                results = self.backend.recognize(image_list, self.batch_size) if image_list else []
+                return {"texts": [text for _, text, _ in results], "confs": [float(conf) for _, _, conf in results]}
+        raise ValueError(f"unknown request type {kind}")
+
+    def serve_connection(self, conn, address):
+        logging.info(f"Client connected: {address[0]}:{address[1]}")
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with conn:
+            while True:
+                try:
+                    kind, request_id, meta, blobs = read_message(conn)
+                except (ConnectionError, OSError):
+                    break
+                try:
+                    reply = encode_message(RESULT, request_id, self.handle(kind, meta, blobs))
+                except Exception as e:
+                    logging.error(f"Request {request_id} failed: {e}")
+                    reply = encode_message(ERROR, request_id, {"error": str(e)})
+                self.requests += 1
+                try:
+                    conn.sendall(reply)
+                except OSError:
+                    break
+        logging.info(f"Client disconnected: {address[0]}:{address[1]}")
+
+    def serve_forever(self):
+        while True:
+            conn, address = self.listener.accept()
+            threading.Thread(target=self.serve_connection, args=(conn, address), daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+def check(host, port, image_path):
+    """Round-trip one image through a worker and print what it read"""
+    from ocr_backends import RemoteBackend
+    backend = RemoteBackend(host, port, fallback=None)
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    start = time.time()
+    for box, text, conf in backend.readtext(image, batch_size=16):
+        print(f"{text!r} ({conf:.2f}) at {box}")
+    print(f"Round trip: {1000 * (time.time() - start):.0f} ms")
+    backend.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remote OCR worker for ocr_monitor.py.")
+    parser.add_argument("--serve", action="store_true", help="Run the worker")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on (or to check)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default="easyocr", help="OCR backend the worker runs")
+    parser.add_argument("--batch-size", type=int, default=16, help="Crops per recognizer forward pass")
+    parser.add_argument("--check", metavar="IMAGE", help="Send IMAGE to the worker at --host and print the reads")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.check:
+        check(args.host, args.port, args.check)
+    elif args.serve:
+        from ocr_backends import create_backend
+        server = OCRServer(create_backend(args.backend), args.host, args.port, args.batch_size)
+        logging.info(f"Remote OCR worker ({args.backend}) listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Shutting down by user request")
+        finally:
+            server.close()
+    else:
+        parser.print_help()
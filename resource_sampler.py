@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# Resource sampler for a SLAM session, started in the background by vslam.sh.
+# Every INTERVAL seconds it records, for each watched process (and the
+# children it spawned, e.g. the OCR worker), CPU use, RSS, thread count and
+# disk I/O, plus SoC temperature, CPU frequency and the firmware throttle flag.
+# Everything comes from /proc and sysfs, a few file reads per process.
+#
+# Samples are written as a columnar file: a sequence of chunks, each a 4-byte
+# length, a JSON header naming the columns and their dtypes, then each column's
+# values back to back. A chunk is written every FLUSH_ROWS samples, so a killed
+# sampler loses at most that many; load_samples() joins the chunks, filling
+# columns a chunk lacks (a process that wasn't running yet) with NaN.
+#
+#   python resource_sampler.py --out LOG_DIR/resources_TS.res               # sample until the session ends
+#   python resource_sampler.py --report LOG_DIR/resources_TS.res \
+#       --trajectory CameraTrajectory.txt --detections OCR_Logs/ocr_detections_20250101.txt
+import argparse
+import json
+import os
+import re
+import signal
+import struct
+import time
+from datetime import datetime
+import numpy as np
+from thermal import ThermalSampler
+
+# column prefix -> substring of the command line that identifies the process
+PROCESSES = {
+    "slam": "mono_webcam",
+    "ocr": "ocr_monitor.py",
+    "flask": "flask_motor.py",
+    "broker": "frame_broker.py",
+}
+METRICS = ("cpu", "rss_mb", "threads", "read_kbs", "write_kbs")  # cpu in % of one core
+INTERVAL = 1.0
+FLUSH_ROWS = 30
+RESCAN_SECONDS = 5.0  # how often /proc is searched for new or restarted processes
+CHUNK_LENGTH = struct.Struct('!I')
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def read_stat(pid):
+    """(ppid, cpu seconds, threads, rss MB) from /proc/<pid>/stat, or None once the process is gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()  # the command name may contain spaces
+        return int(fields[1]), (int(fields[11]) + int(fields[12])) / CLK_TCK, int(fields[17]), int(fields[21]) * PAGE_MB
+    except (OSError, ValueError, IndexError):
+        return None
+
+def read_io(pid):
+    """(bytes read, bytes written) at the block layer, or None (gone, or another user's process)"""
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            values = dict(line.split(":") for line in f)
+        return int(values["read_bytes"]), int(values["write_bytes"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def find_processes(patterns=PROCESSES):
+    """{name: set of pids}: each matching process plus all of its descendants"""
+    cmdlines, children = {}, {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        try:
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                cmdlines[pid] = f.read().replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            continue
+        stat = read_stat(pid)
+        if stat is not None:
+            children.setdefault(stat[0], []).append(pid)
+    found = {}
+    for name, pattern in patterns.items():
+        roots = [pid for pid, cmdline in cmdlines.items()
+                 if pattern in cmdline and pid != os.getpid() and "resource_sampler" not in cmdline]
+        pids, stack = set(), roots
+        while stack:
+            pid = stack.pop()
+            if pid not in pids:
+                pids.add(pid)
+                stack.extend(children.get(pid, []))
+        if pids:
+            found[name] = pids
+    return found
+
+class ColumnWriter:
+    def __init__(self, path, flush_rows=FLUSH_ROWS):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.rows = []  # dicts of column -> value
+
+    def append(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        names = sorted({name for row in self.rows for name in row}, key=lambda n: (n != "time", n))
+        columns = []
+        for name in names:
+            dtype = "<f8" if name == "time" else "<f4"
+            columns.append((name, dtype, np.array([row.get(name, np.nan) for row in self.rows], dtype=dtype)))
+        header = json.dumps({"rows": len(self.rows), "columns": [[name, dtype] for name, dtype, _ in columns]}).encode()
+        with open(self.path, 'ab') as f:
+            f.write(CHUNK_LENGTH.pack(len(header)) + header)
+            for _, _, values in columns:
+                f.write(values.tobytes())
+        self.rows = []
+
+def load_samples(path):
+    """{column: array} for a sampler file; "time" is seconds since the epoch"""
+    chunks = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset + CHUNK_LENGTH.size <= len(data):
+        (length,) = CHUNK_LENGTH.unpack_from(data, offset)
+        offset += CHUNK_LENGTH.size
+        header = json.loads(data[offset:offset + length])
+        offset += length
+        chunk = {}
+        for name, dtype in header["columns"]:
+            size = header["rows"] * np.dtype(dtype).itemsize
+            if offset + size > len(data):
+                break  # cut short by a kill mid-write
+            chunk[name] = np.frombuffer(data, dtype, header["rows"], offset)
+            offset += size
+        else:
+            chunks.append((header["rows"], chunk))
+    names = sorted({name for _, chunk in chunks for name in chunk}, key=lambda n: (n != "time", n))
+    return {name: np.concatenate([chunk[name] if name in chunk else np.full(rows, np.nan, "<f4")
+                                  for rows, chunk in chunks]) if chunks else np.array([])
+            for name in names}
+
+class ResourceSampler:
+    def __init__(self, writer, patterns=PROCESSES, interval=INTERVAL, thermal=None):
+        self.writer = writer
+        self.patterns = patterns
+        self.interval = interval
+        self.thermal = thermal or ThermalSampler(interval=0.0)
+        self.processes = {}  # name -> set of pids
+        self.last = {}       # pid -> (time, cpu seconds, io bytes or None)
+        self.last_scan = 0.0
+        self.last_seen = None  # when any watched process was last running
+        self.samples = 0
+
+    def sample(self, now=None):
+        now = time.time() if now is None else now
+        if now - self.last_scan >= RESCAN_SECONDS:
+            self.processes = find_processes(self.patterns)
+            self.last_scan = now
+        row = {"time": now}
+        for name, pids in self.processes.items():
+            totals = dict.fromkeys(METRICS, 0.0)
+            alive = False
+            for pid in list(pids):
+                stat = read_stat(pid)
+                if stat is None:
+                    pids.discard(pid)
+                    self.last.pop(pid, None)
+                    continue
+                alive = True
+                _, cpu, threads, rss = stat
+                io = read_io(pid)
+                totals["threads"] += threads
+                totals["rss_mb"] += rss
+                previous = self.last.get(pid)
+                if previous is not None:
+                    dt = max(now - previous[0], 1e-6)
+                    totals["cpu"] += 100.0 * (cpu - previous[1]) / dt
+                    if io is not None and previous[2] is not None:
+                        totals["read_kbs"] += (io[0] - previous[2][0]) / 1024 / dt
+                        totals["write_kbs"] += (io[1] - previous[2][1]) / 1024 / dt
+                self.last[pid] = (now, cpu, io)
+            if alive:
+                self.last_seen = now
+                row.update({f"{name}.{metric}": value for metric, value in totals.items()})
+        state = self.thermal.sample(now)
+        row["temp_c"] = np.nan if state.temp_c is None else state.temp_c
+        row["freq_mhz"] = np.nan if state.freq_mhz is None else state.freq_mhz
+        row["throttled"] = np.nan if state.throttled is None else float(state.throttled)
+        self.writer.append(row)
+        self.samples += 1
+        return row
+
+    def run(self, exit_after=None):
+        """Sample until SIGTERM/SIGINT, or until no watched process has run for `exit_after` seconds"""
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        started = time.time()
+        try:
+            while not stopping:
+                began = time.time()
+                self.sample(began)
+                if exit_after is not None and began - (self.last_seen or started) > exit_after:
+                    break
+                time.sleep(max(0.0, self.interval - (time.time() - began)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.writer.flush()
+
+# --- analysis -------------------------------------------------------------
+
+def align(samples, times):
+    """{column: values} of the last sample at or before each of `times` (NaN before the first sample)"""
+    times = np.asarray(times, dtype=float)
+    index = np.searchsorted(samples["time"], times, side="right") - 1
+    valid = index >= 0
+    aligned = {}
+    for name, values in samples.items():
+        out = np.full(len(times), np.nan)
+        out[valid] = values[index[valid]]
+        aligned[name] = out
+    return aligned
+
+def load_trajectory_times(path, start_time=None):
+    """Timestamps of a TUM trajectory (ORB-SLAM3's CameraTrajectory.txt etc.) in seconds since the epoch.
+
+    Trajectories stamped relative to the session (values far below an epoch
+    time) are shifted by `start_time`, e.g. the sampler's first sample.
+    """
+    times = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 8 and not line.startswith("#"):
+                times.append(float(parts[0]))
+    times = np.array(times)
+    if len(times) and times.max() < 1e9:
+        if start_time is None:
+            raise ValueError(f"{path} has session-relative timestamps; pass the session start time")
+        times = times + start_time
+    return times
+
+def load_detection_times(path):
+    """Times of the detections in an ocr_detections_*.txt log (local time, to the second)"""
+    times = []
+    with open(path) as f:
+        for line in f:
+            match = re.match(r"== (\d{8}_\d{6}) ==", line)
+            if match:
+                times.append(datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp())
+    return np.array(times)
+
+def tracking_gaps(times, min_gap=1.0):
+    """(start, end) of every stretch longer than `min_gap` seconds with no trajectory pose: tracking lost"""
+    times = np.sort(np.asarray(times, dtype=float))
+    gaps = np.diff(times) > min_gap
+    return list(zip(times[:-1][gaps], times[1:][gaps]))
+
+def window_mask(samples, windows):
+    mask = np.zeros(len(samples["time"]), dtype=bool)
+    for start, end in windows:
+        mask |= (samples["time"] >= start) & (samples["time"] <= end)
+    return mask
+
+def compare(samples, mask, label):
+    """Mean of every column inside `mask` against outside it, as report lines"""
+    if not mask.any() or mask.all():
+        return [f"{label}: no samples to compare"]
+    lines = [f"{label} ({mask.sum()} of {len(mask)} samples): column, inside vs. outside"]
+    for name, values in samples.items():
+        if name == "time":
+            continue
+        inside, outside = values[mask], values[~mask]
+        if np.isnan(inside).all() or np.isnan(outside).all():
+            continue
+        lines.append(f"  {name:<18} {np.nanmean(inside):>9.1f} vs {np.nanmean(outside):>9.1f}")
+    return lines
+
+KEY_COLUMNS = ("slam.cpu", "ocr.cpu", "ocr.rss_mb", "temp_c", "throttled")  # shown per event
+MAX_EVENTS = 20
+
+def at_events(samples, times, label):
+    """Report lines with the key columns as they were at each of `times` (the sample just before)"""
+    aligned = align(samples, times)
+    columns = [name for name in KEY_COLUMNS if name in aligned]
+    lines = [f"{label} (first {min(len(times), MAX_EVENTS)} of {len(times)}):"]
+    for i, t in enumerate(times[:MAX_EVENTS]):
+        values = " | ".join(f"{name} {aligned[name][i]:.1f}" for name in columns)
+        lines.append(f"  {datetime.fromtimestamp(t).strftime('%H:%M:%S')}  {values}")
+    return lines
+
+def report(samples, trajectory_times=None, detection_times=None, min_gap=1.0, context=5.0):
+    if not len(samples.get("time", [])):
+        return "No samples"
+    duration = samples["time"][-1] - samples["time"][0]
+    lines = [f"{len(samples['time'])} samples over {duration / 60:.1f} min"]
+    for name, values in samples.items():
+        if name != "time" and not np.isnan(values).all():
+            lines.append(f"  {name:<18} mean {np.nanmean(values):>9.1f}  max {np.nanmax(values):>9.1f}")
+    if trajectory_times is not None:
+        gaps = tracking_gaps(trajectory_times, min_gap)
+        lines.append(f"{len(gaps)} tracking gaps over {min_gap:.1f}s")
+        lines += compare(samples, window_mask(samples, [(start - context, end) for start, end in gaps]),
+                         f"Around tracking gaps (from {context:.0f}s before)")
+        if gaps:
+            lines += at_events(samples, [start for start, _ in gaps], "At the last pose before each gap")
+    if detection_times is not None:
+        lines += compare(samples, window_mask(samples, [(t - context, t) for t in detection_times]),
+                         f"The {context:.0f}s before {len(detection_times)} detections")
+        if len(detection_times):
+            lines += at_events(samples, detection_times, "At each detection")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample per-process resources during a SLAM session, or report on a run.")
+    parser.add_argument("--out", help="file to append samples to")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds between samples")
+    parser.add_argument("--exit-after", type=float, default=None,
+                        help="stop once no watched process has run for this many seconds")
+    parser.add_argument("--report", metavar="FILE", help="summarise a sampler file instead")
+    parser.add_argument("--trajectory", help="TUM trajectory of the same run, for tracking gaps")
+    parser.add_argument("--detections", help="ocr_detections_*.txt log of the same run")
+    parser.add_argument("--min-gap", type=float, default=1.0, help="seconds without a pose that count as lost")
+    args = parser.parse_args()
+    if args.report:
+        samples = load_samples(args.report)
+        start = samples["time"][0] if len(samples.get("time", [])) else None
+        trajectory = load_trajectory_times(args.trajectory, start) if args.trajectory else None
+        detections = load_detection_times(args.detections) if args.detections else None
+        print(report(samples, trajectory, detections, args.min_gap))
+    elif args.out:
+        sampler = ResourceSampler(ColumnWriter(args.out), interval=args.interval)
+        print(f"Sampling {', '.join(PROCESSES)} every {args.interval}s to {args.out}", flush=True)
+        sampler.run(args.exit_after)
+        print(f"Wrote {sampler.samples} samples to {args.out}")
+    else:
+        parser.error("--out or --report is required")
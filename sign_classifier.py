@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Tiny "clinic sign present" classifier: HOG features and a linear model.
+# Cheap enough to score every camera frame, so OCR only runs on frames (and
+# regions) that look like they contain a sign. Trained offline by
+# code/train_sign_classifier.py from logged detections; the model is a small
+# .npz that loads in milliseconds.
+import cv2
+import numpy as np
+
+WINDOW = (64, 32)         # (width, height) of a scored patch; text lines are scaled to this height
+CELL = 8                  # HOG cell size; blocks are 2x2 cells at a one-cell stride
+BINS = 9                  # unsigned orientation bins
+WINDOW_STRIDE = (2, 1)    # sliding step at each pyramid level, in cells
+PYRAMID = (0.75, 0.5, 0.35)  # frame scales scored; covers text lines ~10-90 px tall at 640x480
+REGION_MARGIN = 0.5       # context added around grouped windows, as a fraction of their height
+MAX_REGION_AREA = 0.5     # regions covering more of the frame than this: just run OCR on all of it
+
+WINDOW_BLOCKS = (WINDOW[1] // CELL - 1, WINDOW[0] // CELL - 1)  # (rows, cols) of blocks per window
+FEATURE_SIZE = WINDOW_BLOCKS[0] * WINDOW_BLOCKS[1] * 4 * BINS
+
+def hog_blocks(grey):
+    """Normalised 2x2-cell HOG blocks over a whole image, shape (rows, cols, 4 * BINS).
+
+    Computed once per image so every sliding window is just a slice of the
+    block grid (cv2.HOGDescriptor is not in every OpenCV build).
+    """
+    rows, cols = grey.shape[0] // CELL, grey.shape[1] // CELL
+    grey = grey[:rows * CELL, :cols * CELL].astype(np.float32)
+    gx = cv2.Sobel(grey, cv2.CV_32F, 1, 0, ksize=1)
+    gy = cv2.Sobel(grey, cv2.CV_32F, 0, 1, ksize=1)
+    magnitude, angle = cv2.cartToPolar(gx, gy, angleInDegrees=True)
+    bins = (np.mod(angle, 180.0) * (BINS / 180.0)).astype(np.int32) % BINS
+    cell = (np.arange(rows * CELL)[:, None] // CELL) * cols + np.arange(cols * CELL)[None, :] // CELL
+    hist = np.bincount((cell * BINS + bins).ravel(), weights=magnitude.ravel(),
+                       minlength=rows * cols * BINS).reshape(rows, cols, BINS)
+    blocks = np.concatenate([hist[:-1, :-1], hist[:-1, 1:], hist[1:, :-1], hist[1:, 1:]], axis=2)
+    return blocks / np.sqrt((blocks ** 2).sum(axis=2, keepdims=True) + 1e-6)
+
+def window_features(grey):
+    """HOG vectors of every window position, row-major, shape (rows, cols, FEATURE_SIZE)"""
+    blocks = hog_blocks(grey)
+    block_rows, block_cols = WINDOW_BLOCKS
+    if blocks.shape[0] < block_rows or blocks.shape[1] < block_cols:
+        return np.empty((0, 0, FEATURE_SIZE), np.float32)
+    views = np.lib.stride_tricks.sliding_window_view(blocks, (block_rows, block_cols), axis=(0, 1))
+    views = views[::WINDOW_STRIDE[1], ::WINDOW_STRIDE[0]]  # (rows, cols, 4 * BINS, block_rows, block_cols)
+    return views.transpose(0, 1, 3, 4, 2).reshape(views.shape[0], views.shape[1], FEATURE_SIZE)
+
+class SignClassifier:
+    """Scores sliding windows of a grey frame for sign text"""
+
+    def __init__(self, weights, bias, mean, std, threshold):
+        # fold the feature standardisation into the linear model
+        self.weights = (weights / std).astype(np.float32)
+        self.bias = float(bias - np.dot(weights, mean / std))
+        self.threshold = float(threshold)
+        self.frames = 0
+        self.positive_frames = 0
+
+    @classmethod
+    def load(cls, path):
+        model = np.load(path)
+        if tuple(model["window"]) != WINDOW or int(model["feature_size"]) != FEATURE_SIZE:
+            raise ValueError(f"{path} was trained with different HOG settings; retrain it")
+        return cls(model["weights"], float(model["bias"]), model["mean"], model["std"], float(model["threshold"]))
+
+    def score(self, features):
+        return features @ self.weights + self.bias
+
+    def windows(self, grey):
+        """(x0, y0, x1, y1, score) in frame pixels for every window above the threshold"""
+        found = []
+        for scale in PYRAMID:
+            small = cv2.resize(grey, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            scores = self.score(window_features(small))
+            for row, col in zip(*np.nonzero(scores >= self.threshold)):
+                x, y = col * WINDOW_STRIDE[0] * CELL, row * WINDOW_STRIDE[1] * CELL
+                found.append((x / scale, y / scale, (x + WINDOW[0]) / scale, (y + WINDOW[1]) / scale,
+                              float(scores[row, col])))
+        return found
+
+    def regions(self, grey):
+        """Boxes worth OCR as (x0, y0, x1, y1) in frame pixels: [] for no sign, None for the whole frame"""
+        self.frames += 1
+        found = self.windows(grey)
+        if not found:
+            return []
+        self.positive_frames += 1
+        img_h, img_w = grey.shape
+        mask = np.zeros((img_h, img_w), np.uint8)
+        for x0, y0, x1, y1, _ in found:
+            margin = REGION_MARGIN * (y1 - y0)
+            cv2.rectangle(mask, (int(x0 - margin), int(y0 - margin)), (int(x1 + margin), int(y1 + margin)), 255, -1)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        rects = [cv2.boundingRect(contour) for contour in contours]
+        if sum(w * h for _, _, w, h in rects) > MAX_REGION_AREA * img_w * img_h:
+            return None
+        return [(x, y, x + w, y + h) for x, y, w, h in rects]
+
+    def stats(self):
+        return f"Sign classifier: {self.positive_frames}/{self.frames} frames flagged"
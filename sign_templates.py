@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Visual fast path for signs that have already been read.
+# A confidently read sign instance is stored as ORB features of its region.
+# Later frames are matched against the store with a homography check, so a
+# known sign is identified by descriptor matching instead of OCR; only text
+# regions no template explains still go to the recognizer.
+import time
+import cv2
+import numpy as np
+
+ORB_FEATURES = 500        # features per frame
+TEMPLATE_MARGIN = 0.3     # context kept around a sign's quad, as a fraction of its height
+MIN_TEMPLATE_FEATURES = 15
+RATIO_TEST = 0.75         # Lowe's ratio test
+MIN_INLIERS = 12          # RANSAC homography inliers for a positive match
+MIN_INLIER_SPAN = 0.6     # inliers must span this fraction of the sign's width; shared glyphs
+                          # between different words ("AR" in WARD and PHARMACY) only cover a part
+MAX_ASPECT_CHANGE = 2.0   # projected sign may not stretch its width/height ratio more than this
+MAX_PER_KEYWORD = 4       # viewpoints kept per keyword; least recently matched is dropped
+
+def quad_aspect(quad):
+    width = 0.5 * (np.linalg.norm(quad[1] - quad[0]) + np.linalg.norm(quad[2] - quad[3]))
+    height = 0.5 * (np.linalg.norm(quad[3] - quad[0]) + np.linalg.norm(quad[2] - quad[1]))
+    return width / max(height, 1e-6)
+
+class SignTemplate:
+    def __init__(self, keyword, text, conf, keypoints, descriptors, quad):
+        self.keyword = keyword
+        self.text = text
+        self.conf = conf
+        self.points = np.float32([kp.pt for kp in keypoints])
+        self.descriptors = descriptors
+        self.quad = np.float32(quad)  # sign quad in template coordinates
+        self.last_matched = time.time()
+        self.matches = 0
+
+class SignTemplateStore:
+    """ORB templates of confirmed signs, matched against whole frames"""
+
+    def __init__(self, max_per_keyword=MAX_PER_KEYWORD, min_inliers=MIN_INLIERS):
+        self.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self.max_per_keyword = max_per_keyword
+        self.min_inliers = min_inliers
+        self.templates = []
+        self.frames_matched = 0
+        self.signs_matched = 0
+
+    def __len__(self):
+        return len(self.templates)
+
+    def locate(self, template, keypoints, descriptors):
+        """Template quad projected into the frame, or None"""
+        if descriptors is None or len(keypoints) < 4:
+            return None
+        pairs = self.matcher.knnMatch(template.descriptors, descriptors, k=2)
+        good = [m for m, *rest in pairs if rest and m.distance < RATIO_TEST * rest[0].distance]
+        if len(good) < self.min_inliers:
+            return None
+        src = template.points[[m.queryIdx for m in good]]
+        dst = np.float32([keypoints[m.trainIdx].pt for m in good])
+        H, inliers = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+        if H is None or int(inliers.sum()) < self.min_inliers:
+            return None
+        matched = src[inliers.ravel() > 0, 0]
+        width = template.quad[:, 0].max() - template.quad[:, 0].min()
+        if matched.max() - matched.min() < MIN_INLIER_SPAN * width:
+            return None
+        quad = cv2.perspectiveTransform(template.quad.reshape(-1, 1, 2), H).reshape(4, 2)
+        if not cv2.isContourConvex(quad.astype(np.int32)):
+            return None
+        change = quad_aspect(quad) / quad_aspect(template.quad)
+        if not 1 / MAX_ASPECT_CHANGE <= change <= MAX_ASPECT_CHANGE:
+            return None
+        return quad
+
+    def match(self, grey):
+        """readtext-style (bbox, text, conf) for every stored sign visible in the frame"""
+        if not self.templates:
+            return []
+        keypoints, descriptors = self.orb.detectAndCompute(grey, None)
+        found = {}
+        for template in self.templates:
+            if template.keyword in found:
+                continue
+            quad = self.locate(template, keypoints, descriptors)
+            if quad is not None:
+                template.last_matched = time.time()
+                template.matches += 1
+                found[template.keyword] = (quad.round().astype(int).tolist(), template.text, template.conf)
+        if found:
+            self.frames_matched += 1
+            self.signs_matched += len(found)
+        return list(found.values())
+
+    def learn(self, grey, quad, keyword, text, conf):
+        """Store a confirmed read as a template unless an existing one already covers it"""
+        quad = np.float32(quad)
+        img_h, img_w = grey.shape
+        height = max(np.linalg.norm(quad[3] - quad[0]), np.linalg.norm(quad[2] - quad[1]))
+        margin = int(TEMPLATE_MARGIN * height)
+        x0 = max(0, int(quad[:, 0].min()) - margin)
+        x1 = min(img_w, int(quad[:, 0].max()) + margin)
+        y0 = max(0, int(quad[:, 1].min()) - margin)
+        y1 = min(img_h, int(quad[:, 1].max()) + margin)
+        region = grey[y0:y1, x0:x1]
+        if region.size == 0:
+            return False
+
+        keypoints, descriptors = self.orb.detectAndCompute(region, None)
+        if descriptors is None or len(keypoints) < MIN_TEMPLATE_FEATURES:
+            return False
+        same_keyword = [t for t in self.templates if t.keyword == keyword]
+        if any(self.locate(t, keypoints, descriptors) is not None for t in same_keyword):
+            return False  # this viewpoint is already known
+
+        if len(same_keyword) >= self.max_per_keyword:
+            self.templates.remove(min(same_keyword, key=lambda t: t.last_matched))
+        self.templates.append(SignTemplate(keyword, text, conf, keypoints, descriptors, quad - (x0, y0)))
+        return True
+
+    def stats(self):
+        return (f"Templates: {len(self.templates)} stored | {self.signs_matched} signs matched "
+                f"in {self.frames_matched} frames")
+
+def covered(box, known):
+    """True if a detected box's centre lies inside an already identified sign"""
+    centre = tuple(float(v) for v in np.mean(np.float32(box), axis=0))
+    return any(cv2.pointPolygonTest(np.float32(quad), centre, False) >= 0 for quad, _, _ in known)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Startup timeline and readiness file for ocr_monitor.py.
+# Times are measured from process start (read from /proc, so the interpreter
+# and module imports are included), and the ready file tells vslam.sh that
+# the pipe is open and the OCR models are loaded and warm.
+import logging
+import os
+import threading
+import time
+
+_IMPORTED = time.time()
+
+def process_start_time():
+    """Wall-clock time this process was started, or when this module was imported if /proc is unavailable"""
+    try:
+        with open("/proc/self/stat") as f:
+            # the command name may contain spaces; fields after it are fixed
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return _IMPORTED
+
+class StartupTimeline:
+    def __init__(self, origin=None):
+        self.origin = process_start_time() if origin is None else origin
+        self.marks = []  # (seconds since origin, event)
+        self.lock = threading.Lock()  # the backend is loaded on another thread
+
+    def mark(self, event, at=None):
+        offset = (time.time() if at is None else at) - self.origin
+        with self.lock:
+            self.marks.append((offset, event))
+        logging.info(f"Startup: {event} at +{offset:.2f}s")
+
+    def summary(self):
+        with self.lock:
+            marks = sorted(self.marks)
+        return "Startup timeline: " + " | ".join(f"{event} +{offset:.2f}s" for offset, event in marks)
+
+def write_ready(path):
+    """Atomically create the readiness file with this pid; launchers wait for it to appear"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(f"{os.getpid()}\n")
+    os.replace(tmp_path, path)
+
+def clear_ready(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
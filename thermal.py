@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Thermal headroom for OCR.
+# Once the Pi throttles, ORB-SLAM3 loses tracking before anyone notices, so
+# OCR gives up duty cycle as the SoC heats: full rate below the soft limit,
+# down to a floor at the hard limit or whenever the firmware reports
+# throttling. Everything is read from sysfs; the paths are parameters so a
+# directory of fake files can stand in for a test.
+import glob
+import time
+from collections import namedtuple
+
+THERMAL_ZONES = "/sys/class/thermal/thermal_zone*/temp"              # millidegrees C
+CPU_FREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"  # kHz
+CPU_MAX_FREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq"
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"  # Pi firmware flags, hex
+THROTTLE_NOW_BITS = 0xF  # under-voltage, frequency capped, throttled, soft temperature limit
+
+SOFT_LIMIT_C = 70.0  # OCR starts giving up duty here
+HARD_LIMIT_C = 80.0  # and is at MIN_DUTY here (Pi 5 firmware throttles at 85)
+MIN_DUTY = 0.1
+
+ThermalState = namedtuple("ThermalState", "temp_c freq_mhz max_freq_mhz throttled")
+
+def read_number(path, base=10):
+    try:
+        with open(path) as f:
+            return int(f.read().strip(), base)
+    except (OSError, ValueError):
+        return None
+
+class ThermalSampler:
+    """Samples temperature, CPU frequency and throttle flags at most every `interval` seconds"""
+
+    def __init__(self, zones=THERMAL_ZONES, freq_path=CPU_FREQ_PATH, max_freq_path=CPU_MAX_FREQ_PATH,
+                 throttled_path=THROTTLED_PATH, soft_limit=SOFT_LIMIT_C, hard_limit=HARD_LIMIT_C,
+                 min_duty=MIN_DUTY, interval=2.0):
+        self.zone_paths = sorted(glob.glob(zones))
+        self.freq_path = freq_path
+        self.max_freq_path = max_freq_path
+        self.throttled_path = throttled_path
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.min_duty = min_duty
+        self.interval = interval
+        self.state = None
+        self.last_sample = 0.0
+        self.peak_temp = None
+        self.throttled_samples = 0
+
+    def sample(self, now=None):
+        now = time.time() if now is None else now
+        if self.state is not None and now - self.last_sample < self.interval:
+            return self.state
+        self.last_sample = now
+        temps = [t for t in (read_number(path) for path in self.zone_paths) if t is not None]
+        temp = max(temps) / 1000.0 if temps else None
+        freq = read_number(self.freq_path)
+        max_freq = read_number(self.max_freq_path)
+        flags = read_number(self.throttled_path, 16)
+        throttled = None if flags is None else bool(flags & THROTTLE_NOW_BITS)
+        self.state = ThermalState(temp, freq / 1000.0 if freq else None, max_freq / 1000.0 if max_freq else None,
+                                  throttled)
+        if temp is not None:
+            self.peak_temp = temp if self.peak_temp is None else max(self.peak_temp, temp)
+        if throttled:
+            self.throttled_samples += 1
+        return self.state
+
+    def duty(self, now=None):
+        """Fraction of the normal OCR rate the current headroom allows, MIN_DUTY..1"""
+        state = self.sample(now)
+        if state.throttled:
+            return self.min_duty
+        if state.temp_c is None:
+            return 1.0  # no sensor: don't guess
+        heat = (state.temp_c - self.soft_limit) / max(self.hard_limit - self.soft_limit, 1e-6)
+        return 1.0 - min(max(heat, 0.0), 1.0) * (1.0 - self.min_duty)
+
+    def summary(self):
+        state = self.sample()
+        temp = f"{state.temp_c:.1f}°C" if state.temp_c is not None else "temp n/a"
+        freq = f"{state.freq_mhz:.0f}/{state.max_freq_mhz:.0f} MHz" if state.freq_mhz and state.max_freq_mhz else "freq n/a"
+        throttled = {None: "n/a", True: "YES", False: "no"}[state.throttled]
+        return f"{temp} | {freq} | throttled {throttled} | OCR duty {100 * self.duty():.0f}%"
+
+    def stats(self):
+        peak = f"{self.peak_temp:.1f}°C" if self.peak_temp is not None else "n/a"
+        return f"Thermal: peak {peak} | {self.throttled_samples} throttled samples"
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Overlapping tiles for high-resolution frames.
+# Full-frame detection at 1080p is far too slow and downscaling loses distant
+# signs, so large frames are cut into overlapping detector-sized tiles and a
+# few tiles are detected per frame, round-robin. Text split by a tile seam is
+# glued back together by merging boxes on the same row across tiles.
+import numpy as np
+
+def make_tiles(shape, tile_size, overlap):
+    """(x0, y0, x1, y1) tiles covering an image, neighbours sharing `overlap` of a tile"""
+    img_h, img_w = shape[:2]
+    tile_w, tile_h = min(tile_size[0], img_w), min(tile_size[1], img_h)
+
+    def starts(length, tile):
+        if length <= tile:
+            return [0]
+        step = max(1, int(tile * (1 - overlap)))
+        count = int(np.ceil((length - tile) / step)) + 1
+        # spread the tiles evenly so the last one ends on the image edge
+        return np.linspace(0, length - tile, count).round().astype(int).tolist()
+
+    return [(x, y, x + tile_w, y + tile_h) for y in starts(img_h, tile_h) for x in starts(img_w, tile_w)]
+
+class TileScheduler:
+    """Hands out a frame's tiles round-robin, a few per frame"""
+
+    def __init__(self, tile_size, overlap, tiles_per_frame=1):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.tiles_per_frame = tiles_per_frame
+        self.shape = None
+        self.tiles = []
+        self.next_index = 0
+
+    def next(self, shape):
+        if shape[:2] != self.shape:
+            self.shape = shape[:2]
+            self.tiles = make_tiles(shape, self.tile_size, self.overlap)
+            self.next_index = 0
+        count = min(self.tiles_per_frame, len(self.tiles))
+        picked = [self.tiles[(self.next_index + i) % len(self.tiles)] for i in range(count)]
+        self.next_index = (self.next_index + count) % len(self.tiles)
+        return picked
+
+def box_rect(box):
+    pts = np.asarray(box, dtype=np.float32)
+    return float(pts[:, 0].min()), float(pts[:, 1].min()), float(pts[:, 0].max()), float(pts[:, 1].max())
+
+def same_row(a, b, min_overlap):
+    """Rects share a text row (most of the shorter one's height) and touch or overlap along it"""
+    overlap_w = min(a[2], b[2]) - max(a[0], b[0])
+    overlap_h = min(a[3], b[3]) - max(a[1], b[1])
+    return overlap_w >= 0 and overlap_h >= min_overlap * min(a[3] - a[1], b[3] - b[1])
+
+def iou(a, b):
+    overlap_w = min(a[2], b[2]) - max(a[0], b[0])
+    overlap_h = min(a[3], b[3]) - max(a[1], b[1])
+    if overlap_w <= 0 or overlap_h <= 0:
+        return 0.0
+    inter = overlap_w * overlap_h
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+def area(rect):
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+def merge_boxes(boxes, min_overlap=0.5, nms_iou=0.5):
+    """Merge seam-split boxes on the same text row into their union; of other boxes that
+    overlap by `nms_iou` or more (duplicates from overlapping tiles) keep the larger.
+    Lines stacked on top of each other are never merged."""
+    rects = [box_rect(box) for box in boxes]
+    boxes = list(boxes)
+    merged = [False] * len(boxes)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a is None or b is None:
+                    continue
+                if same_row(a, b, min_overlap):
+                    rects[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    merged[i] = True
+                elif iou(a, b) >= nms_iou:
+                    if area(b) > area(a):
+                        rects[i], boxes[i], merged[i] = b, boxes[j], merged[j]
+                else:
+                    continue
+                rects[j] = None
+                changed = True
+    result = []
+    for box, rect, was_merged in zip(boxes, rects, merged):
+        if rect is None:
+            continue
+        if was_merged:
+            x0, y0, x1, y1 = rect
+            box = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+        result.append(box)
+    return result
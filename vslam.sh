@@ -19,6 +19,9 @@ VOCAB_PATH="$HOME/dev/ORB_SLAM3/Vocabulary/ORBvoc.txt"
 MAP_PATH="$HOME/dev/ORB_SLAM3/Maps/clinic_map_atlas.bag"
 EXE_PATH="$HOME/dev/ORB_SLAM3/build/Examples/Monocular/mono_webcam"
 PIPE_PATH="/tmp/frames.pipe"
+OCR_READY="/tmp/ocr_monitor.ready"
+OCR_READY_TIMEOUT=120
+RESOURCE_INTERVAL=1.0  # seconds between resource samples (resource_sampler.py)
 LOG_DIR="$HOME/dev/ORB_SLAM3/Logs"
 mkdir -p "$LOG_DIR"
 
@@ -36,13 +39,14 @@ tmux has-session -t $SESSION 2>/dev/null && tmux kill-session -t $SESSION
 pkill -f mono_webcam 2>/dev/null
 pkill -f ocr_monitor.py 2>/dev/null
 pkill -f flask_motor.py 2>/dev/null
+pkill -f resource_sampler.py 2>/dev/null
 fuser -k 5000/tcp 2>/dev/null
 
 # Free GPIO
 # python3 -c "import lgpio; h=lgpio.gpiochip_open(0); pins=[12,13,17,27,22,23]; [lgpio.gpio_free(h,p) for p in pins if lgpio.gpio_get_mode(h,p) != lgpio.FREE]; lgpio.gpiochip_close(h)" || echo "WARNING: GPIO cleanup failed"
 
 # Camera setup
-rm -f "$PIPE_PATH"
+rm -f "$PIPE_PATH" "$OCR_READY"
 mkfifo "$PIPE_PATH"
 chmod 666 "$PIPE_PATH"
 
@@ -94,6 +98,13 @@ fi
 SLAM_LOG="$LOG_DIR/slam_$TS.log"
 OCR_LOG="$LOG_DIR/ocr_$TS.log"
 FLASK_LOG="$LOG_DIR/flask_$TS.log"
+RESOURCE_FILE="$LOG_DIR/resources_$TS.res"
+
+# Resource sampler: per-process CPU, RSS, threads and I/O plus temperature for this session;
+# it exits on its own a minute after the last SLAM process is gone
+"$VENV_PATH/bin/python" "$SCRIPT_DIR/resource_sampler.py" --out "$RESOURCE_FILE" \
+    --interval "$RESOURCE_INTERVAL" --exit-after 60 > "$LOG_DIR/resources_$TS.log" 2>&1 &
+echo "Sampling resources to $RESOURCE_FILE (pid $!)"
 
 # Helper function
 run_tmux_pane() {
@@ -105,10 +116,7 @@ run_tmux_pane() {
 # Start tmux session
 tmux new-session -d -s $SESSION -n ORB_SLAM3
 
-# Pane 0: ORB_SLAM3
-run_tmux_pane "$SESSION:0.0" "echo 'Running ORB_SLAM3'; \"$EXE_PATH\" \"$VOCAB_PATH\" \"$YAML_FILE\" | tee \"$SLAM_LOG\""
-
-# Pane 1: OCR
+# Pane 1: OCR (first, so its models load while the rest starts)
 tmux split-window -v -t $SESSION:0
 run_tmux_pane "$SESSION:0.1" "echo 'Running ocr_monitor.py'; python ocr_monitor.py | tee \"$OCR_LOG\""
 
@@ -116,6 +124,21 @@ run_tmux_pane "$SESSION:0.1" "echo 'Running ocr_monitor.py'; python ocr_monitor.
 tmux split-window -h -t $SESSION:0.1
 run_tmux_pane "$SESSION:0.2" "echo 'Running flask_motor.py'; python flask_motor.py | tee \"$FLASK_LOG\""
 
+# Wait for OCR to open the pipe and warm its models, so SLAM's first frames are read
+echo "Waiting for ocr_monitor.py to be ready..."
+for ((i = 0; i < OCR_READY_TIMEOUT; i++)); do
+    [[ -f "$OCR_READY" ]] && break
+    sleep 1
+done
+if [[ -f "$OCR_READY" ]]; then
+    echo "OCR ready after ${i}s"
+else
+    echo "WARNING: OCR not ready after ${OCR_READY_TIMEOUT}s, starting SLAM anyway"
+fi
+
+# Pane 0: ORB_SLAM3
+run_tmux_pane "$SESSION:0.0" "echo 'Running ORB_SLAM3'; \"$EXE_PATH\" \"$VOCAB_PATH\" \"$YAML_FILE\" | tee \"$SLAM_LOG\""
+
 tmux select-pane -t $SESSION:0.0
 
 # Attach or finish